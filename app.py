@@ -6,18 +6,83 @@ import re
 import hashlib
 import threading
 import base64
+import io
+import mimetypes
 import uuid
-from datetime import datetime
+import sys
+import traceback
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
 
+from cachetools import LRUCache, TTLCache
+import markdown
+import orjson
 import requests
-from flask import Flask, render_template, request, jsonify, Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PIL import Image
+from flask import Flask, render_template, request, jsonify, redirect, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+import google.auth
+import google.auth.transport.requests
+from google.api_core.exceptions import NotFound, PreconditionFailed
 from google.cloud import firestore, storage
-from weasyprint import HTML
+from google.cloud.firestore_v1.base_query import FieldFilter, Or
 import vertexai
-from vertexai.generative_models import GenerativeModel, Tool, grounding
+from vertexai.generative_models import GenerativeModel, Part, Tool, grounding
+
+import pdf_worker
+from pdf_worker import render_pdf
+
+# gunicorn's gevent worker monkey-patches before importing the app; gRPC
+# (Firestore, Vertex AI) then needs gevent-aware polling so calls yield.
+try:
+    from gevent import monkey
+    if monkey.is_module_patched('socket'):
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+except ImportError:
+    pass
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster encoding of large Firestore result sets."""
+
+    @staticmethod
+    def default(obj):
+        """Serialize Firestore types orjson doesn't handle natively."""
+        if hasattr(obj, 'isoformat'):
+            return obj.isoformat()
+        if isinstance(obj, firestore.GeoPoint):
+            return {'latitude': obj.latitude, 'longitude': obj.longitude}
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def encode(self, obj):
+        """Encode straight to UTF-8 bytes."""
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NAIVE_UTC)
+
+    def dumps(self, obj, **kwargs):
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build jsonify() responses from the encoded bytes, skipping the str round-trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj) + b"\n", mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# Match /api/foo and /api/foo/ alike instead of answering a 308 redirect first
+app.url_map.strict_slashes = False
+# Static assets are long-lived; let browsers cache them for a year
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
 
 # Configuration
 PROJECT_ID = os.environ.get("GCP_PROJECT_ID", "your-project-id")
@@ -26,6 +91,97 @@ MODEL_NAME = os.environ.get("MODEL_NAME", "gemini-2.0-flash-001")
 STORAGE_BUCKET = os.environ.get("STORAGE_BUCKET", f"{PROJECT_ID}-doc-assets")
 MAX_URLS_PER_QUERY = 10
 DOWNLOAD_TIMEOUT = 30
+SOURCE_DOWNLOAD_WORKERS = 8
+# Captured source URLs are reused (copied within GCS) for this long before being fetched again
+URL_CACHE_MAX_AGE = timedelta(days=7)
+
+# GCS compose accepts at most 32 source objects per call
+GCS_COMPOSE_LIMIT = 32
+
+# Read size when hashing or copying uploaded files
+UPLOAD_READ_SIZE = 1 << 20
+
+# Asset downloads fetch from GCS in large ranges and hand them to the client in smaller pieces
+DOWNLOAD_FETCH_SIZE = 8 * 1024 * 1024
+DOWNLOAD_YIELD_SIZE = 256 * 1024
+
+# Asset downloads redirect to a V4 signed GCS URL valid for this long
+SIGNED_URL_TTL = timedelta(minutes=15)
+
+# Documents under these prefixes have content-hashed names, so clients may cache them indefinitely
+IMMUTABLE_DOCUMENT_PREFIXES = ('blueprints/',)
+
+# Feedback screenshots are re-encoded to WebP at this quality before storage
+SCREENSHOT_WEBP_QUALITY = 80
+
+# Source files fetched ahead of the one being zipped; each holds at most DOWNLOAD_FETCH_SIZE bytes
+SOURCE_ZIP_PREFETCH = 8
+
+# Blueprint PDF stylesheet; passed to the PDF pool separately so each worker parses it once
+BLUEPRINT_PDF_CSS = """
+body {
+    font-family: 'Helvetica Neue', Arial, sans-serif;
+    line-height: 1.6;
+    max-width: 800px;
+    margin: 0 auto;
+    padding: 40px;
+    color: #333;
+}
+h1 {
+    color: #1a1a1a;
+    border-bottom: 2px solid #2563eb;
+    padding-bottom: 10px;
+    margin-top: 0;
+}
+h2 {
+    color: #2563eb;
+    margin-top: 30px;
+    border-bottom: 1px solid #e5e7eb;
+    padding-bottom: 8px;
+}
+h3 {
+    color: #4b5563;
+    margin-top: 20px;
+}
+p {
+    margin-bottom: 12px;
+}
+ul, ol {
+    margin-bottom: 16px;
+    padding-left: 24px;
+}
+li {
+    margin-bottom: 6px;
+}
+strong {
+    color: #1a1a1a;
+}
+.header {
+    text-align: center;
+    margin-bottom: 40px;
+    padding-bottom: 20px;
+    border-bottom: 3px solid #2563eb;
+}
+.header h1 {
+    border: none;
+    margin-bottom: 10px;
+}
+.header p {
+    color: #6b7280;
+    font-style: italic;
+}
+"""
+
+# Patterns compiled once at import
+URL_RE = re.compile(r'https?://[^\s<>\[\]()"\']+')
+HTML_TITLE_RE = re.compile(r'<title[^>]*>([^<]+)</title>', re.IGNORECASE)
+MARKDOWN_LINK_RE = re.compile(r'\[([^\]]+)\]\((https?://[^)]+)\)')
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-.]')
+RANGE_HEADER_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+# ASCII control characters except tab, newline and carriage return, plus DEL and C1 controls (0x80-0x9f)
+JSON_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+JSON_STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"', re.DOTALL)
+JSON_STRING_ESCAPES = str.maketrans({'\n': '\\n', '\r': '\\r', '\t': '\\t'})
 
 # App version and environment
 APP_VERSION = os.environ.get("APP_VERSION", "1.0.0")
@@ -35,12 +191,42 @@ APP_ENV = os.environ.get("APP_ENV", "prod")
 vertexai.init(project=PROJECT_ID, location=LOCATION)
 model = GenerativeModel(MODEL_NAME)
 
+# One model per system prompt, so the static instructions go out as system_instruction
+# ahead of the per-request text, where Gemini's implicit prefix caching can reuse them.
+# Keyed by the constant *_SYSTEM_PROMPT strings; bounded so per-request text passed by
+# mistake can't grow it without limit
+SYSTEM_PROMPT_MODELS = LRUCache(maxsize=64)
+SYSTEM_PROMPT_MODELS_LOCK = threading.Lock()
+
 # Initialize Firestore
 db = firestore.Client()
 
 # Initialize Cloud Storage
 storage_client = storage.Client()
 
+# Bucket handles by name, built once per process
+BUCKETS = {}
+# Buckets already confirmed to exist; failures are not recorded so they get retried
+VERIFIED_BUCKETS = set()
+
+# Shared HTTP session for fetching source URLs: pooled keep-alive connections
+# skip a TCP/TLS handshake per request, with light retries on transient errors
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, read=0, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+)
+HTTP_SESSION.mount('https://', HTTP_ADAPTER)
+HTTP_SESSION.mount('http://', HTTP_ADAPTER)
+
+# Shared pool for fanning out independent Firestore/GCS calls within a request
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="io")
+
 # Collection prefix based on environment (dev uses separate collections)
 COLLECTION_PREFIX = "dev_" if APP_ENV == "dev" else ""
 
@@ -54,12 +240,181 @@ COLLECTIONS = {
     'shots': f'{COLLECTION_PREFIX}doc_shots',
     'assets': f'{COLLECTION_PREFIX}doc_assets',
     'scripts': f'{COLLECTION_PREFIX}doc_scripts',
-    'feedback': f'{COLLECTION_PREFIX}doc_feedback'
+    'feedback': f'{COLLECTION_PREFIX}doc_feedback',
+    'url_cache': f'{COLLECTION_PREFIX}doc_url_cache',
+    'blueprint_renders': f'{COLLECTION_PREFIX}doc_blueprint_renders'
 }
 
+# Collection references, built once at import rather than per call
+COLLECTION_REFS = {name: db.collection(path) for name, path in COLLECTIONS.items()}
+
+# Short-lived cache for get_doc, absorbing bursts of repeat lookups (misses included)
+DOC_CACHE = TTLCache(maxsize=4096, ttl=2)
+DOC_CACHE_LOCK = threading.Lock()
+
+# Listing results keyed by their collection fingerprint ETag; any write moves the
+# fingerprint, so entries never go stale and other instances' writes are seen too
+LISTING_CACHE = TTLCache(maxsize=256, ttl=60)
+LISTING_CACHE_LOCK = threading.Lock()
+
+# Unpaginated listings larger than this are streamed rather than built (and cached) in memory
+STREAM_LISTING_THRESHOLD = 500
+
+# Firestore caps a write batch at 500 operations
+FIRESTORE_BATCH_LIMIT = 500
+
+# Firestore caps an 'in' filter at 30 values
+FIRESTORE_IN_LIMIT = 30
+
+# Upper bound for ?limit= on paginated list endpoints
+MAX_PAGE_SIZE = 200
+
+# Collections that hang off a project via projectId
+PROJECT_DATA_COLLECTIONS = ['episodes', 'series', 'research', 'interviews', 'shots', 'assets', 'scripts']
+
 
 # ============== Helper Functions ==============
 
+def now_iso():
+    """Current UTC time as a naive ISO-8601 string, the format stored on every document."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def get_bucket(bucket_name):
+    """Return a reusable Bucket handle for bucket_name."""
+    bucket = BUCKETS.get(bucket_name)
+    if bucket is None:
+        bucket = BUCKETS[bucket_name] = storage_client.bucket(bucket_name)
+    return bucket
+
+
+def compose_blobs(bucket, sources, destination_path, content_type, scratch_prefix):
+    """Concatenate sources into destination_path server-side with GCS compose.
+
+    More than GCS_COMPOSE_LIMIT sources are composed in stages through intermediate objects
+    under scratch_prefix, which are deleted afterwards. Returns the reloaded final blob.
+    """
+    intermediates = []
+    level = 0
+    while len(sources) > GCS_COMPOSE_LIMIT:
+        groups = [sources[i:i + GCS_COMPOSE_LIMIT] for i in range(0, len(sources), GCS_COMPOSE_LIMIT)]
+        parts = [bucket.blob(f"{scratch_prefix}level{level}_{n:04d}") for n in range(len(groups))]
+        # Groups within a level are independent, so compose them concurrently
+        list(IO_EXECUTOR.map(lambda pair: pair[0].compose(pair[1]), zip(parts, groups)))
+        intermediates.extend(parts)
+        sources = parts
+        level += 1
+
+    final_blob = bucket.blob(destination_path)
+    final_blob.content_type = content_type
+    final_blob.compose(sources)
+    if intermediates:
+        delete_blobs_concurrently(intermediates, wait=False)
+    final_blob.reload()
+    return final_blob
+
+
+def delete_blob_if_exists(blob):
+    """Delete a blob, ignoring one that is already gone."""
+    try:
+        blob.delete()
+    except NotFound:
+        pass
+    except Exception as e:
+        print(f"Error deleting {blob.name}: {e}")
+        raise
+
+
+def delete_blobs_concurrently(blobs, wait=True):
+    """Delete blobs in parallel on IO_EXECUTOR, ignoring ones that are already gone.
+
+    With wait=False the deletes are only queued, for cleanup nobody has to wait on.
+    """
+    futures = [IO_EXECUTOR.submit(delete_blob_if_exists, blob) for blob in blobs]
+    if wait:
+        for future in futures:
+            future.result()
+
+
+def hash_stream(stream):
+    """BLAKE2b hex digest and byte length of a file-like object, read in UPLOAD_READ_SIZE pieces.
+
+    Leaves the stream rewound to the start.
+    """
+    # The digest only names the stored object, so use the fastest hash in hashlib rather than MD5
+    hasher = hashlib.blake2b(digest_size=16)
+    size = 0
+    for chunk in iter(lambda: stream.read(UPLOAD_READ_SIZE), b''):
+        hasher.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return hasher.hexdigest(), size
+
+
+SIGNING_CREDENTIALS = {}
+
+
+def signed_download_url(blob, filename, content_type):
+    """V4 signed GET URL that downloads blob as filename, signed via IAM signBlob with the runtime service account."""
+    credentials = SIGNING_CREDENTIALS.get('default')
+    if credentials is None:
+        credentials, _ = google.auth.default(scopes=['https://www.googleapis.com/auth/cloud-platform'])
+        SIGNING_CREDENTIALS['default'] = credentials
+    if not credentials.valid:
+        credentials.refresh(google.auth.transport.requests.Request())
+    return blob.generate_signed_url(
+        version='v4',
+        expiration=SIGNED_URL_TTL,
+        method='GET',
+        service_account_email=credentials.service_account_email,
+        access_token=credentials.token,
+        response_disposition=f'attachment; filename="{filename}"',
+        response_type=content_type
+    )
+
+
+def parse_byte_range(range_header, size):
+    """Resolve a Range header against a file of size bytes.
+
+    Returns (start, end, partial). Anything but a single byte range means the whole file with
+    partial False; returns None when the range can't be satisfied.
+    """
+    start, end = 0, size - 1
+    range_match = RANGE_HEADER_RE.match(range_header or '')
+    if not (range_match and any(range_match.groups())):
+        return start, end, False
+    first, last = range_match.groups()
+    if first:
+        start = int(first)
+        if last:
+            end = min(int(last), end)
+    else:
+        # bytes=-N asks for the last N bytes
+        start = max(size - int(last), 0)
+    if start > end:
+        return None
+    return start, end, True
+
+
+class ZipStreamBuffer:
+    """Write-only, unseekable sink for zipfile that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.pieces = []
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.pieces)
+        self.pieces = []
+        return data
+
+
 def doc_to_dict(doc):
     """Convert Firestore document to dict with id."""
     if doc.exists:
@@ -69,57 +424,401 @@ def doc_to_dict(doc):
     return None
 
 
-def get_all_docs(collection_name, project_id=None):
-    """Get all documents from a collection, optionally filtered by project."""
-    collection = db.collection(COLLECTIONS[collection_name])
-    if project_id:
-        docs = collection.where('projectId', '==', project_id).stream()
+def conditional_jsonify(data, etag=None):
+    """JSON response carrying an ETag; answers 304 when the client's copy is current."""
+    response = jsonify(data)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    if etag:
+        response.set_etag(etag)
     else:
-        docs = collection.stream()
-    return [doc_to_dict(doc) for doc in docs]
+        response.add_etag()
+    return response.make_conditional(request)
 
 
-def get_doc(collection_name, doc_id):
-    """Get a single document by ID."""
-    doc = db.collection(COLLECTIONS[collection_name]).document(doc_id).get()
-    return doc_to_dict(doc)
+def not_modified(etag):
+    """Bare 304 for a client whose cached copy still matches etag."""
+    response = Response(status=304)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(etag)
+    return response
+
+
+def collection_fingerprint(collection_name, project_id=None):
+    """Fingerprint a listing from its newest updatedAt and document count, without reading the documents.
+
+    Returns (etag, count).
+    """
+    query = COLLECTION_REFS[collection_name]
+    if project_id:
+        query = query.where('projectId', '==', project_id)
+    newest = IO_EXECUTOR.submit(lambda: list(
+        query.order_by('updatedAt', direction=firestore.Query.DESCENDING).select(['updatedAt']).limit(1).stream()
+    ))
+    count = count_docs(collection_name, project_id)
+    newest_docs = newest.result()
+    latest = newest_docs[0].get('updatedAt') if newest_docs else ''
+    key = f"{collection_name}:{project_id}:{latest}:{count}:{request.query_string.decode()}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest(), count
+
+
+def requested_fields():
+    """Parse an optional ?fields=a,b,c projection from the query string."""
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    return fields or None
+
+
+def stream_docs_json(collection_name, project_id=None, fields=None):
+    """Yield a JSON array of a collection's documents piece by piece as Firestore streams them."""
+    query = COLLECTION_REFS[collection_name]
+    if project_id:
+        query = query.where('projectId', '==', project_id)
+    if fields:
+        query = query.select(fields)
+    separator = b'['
+    for doc in query.stream():
+        yield separator + app.json.encode(doc_to_dict(doc))
+        separator = b','
+    yield b'[]\n' if separator == b'[' else b']\n'
+
+
+def streamed_listing_response(collection_name, project_id, etag):
+    """Stream a large listing instead of building it in memory; skips the listing cache."""
+    response = Response(
+        stream_docs_json(collection_name, project_id, fields=requested_fields()),
+        mimetype='application/json'
+    )
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(etag)
+    return response
+
+
+def get_all_docs(collection_name, project_id=None, fields=None):
+    """Get all documents from a collection, optionally filtered by project and projected to fields."""
+    query = COLLECTION_REFS[collection_name]
+    if project_id:
+        query = query.where('projectId', '==', project_id)
+    if fields:
+        query = query.select(fields)
+    return [doc_to_dict(doc) for doc in query.stream()]
+
+
+def count_docs(collection_name, project_id=None):
+    """Count documents with a server-side COUNT aggregation instead of streaming them."""
+    query = COLLECTION_REFS[collection_name]
+    if project_id:
+        query = query.where('projectId', '==', project_id)
+    return query.count().get()[0][0].value
+
+
+def get_docs_page(collection_name, project_id=None, limit=50, after=None, fields=None):
+    """Get one page of documents ordered by updatedAt, starting after the given document ID.
+
+    Returns (items, next_cursor); next_cursor is None on the last page. Documents without an
+    updatedAt field never appear in pages (every write path here sets it). Raises ValueError
+    when the cursor document no longer exists, rather than silently restarting at page one.
+    """
+    collection = COLLECTION_REFS[collection_name]
+    query = collection
+    if project_id:
+        query = query.where('projectId', '==', project_id)
+    query = query.order_by('updatedAt')
+    if fields:
+        query = query.select(fields)
+    if after:
+        after_snapshot = collection.document(after).get()
+        if not after_snapshot.exists:
+            raise ValueError(f"Cursor {after} no longer exists; restart from the first page")
+        query = query.start_after(after_snapshot)
+    items = [doc_to_dict(doc) for doc in query.limit(limit).stream()]
+    next_cursor = items[-1]['id'] if len(items) == limit else None
+    return items, next_cursor
+
+
+def cached_listing(etag, load):
+    """Return the listing cached under its fingerprint ETag, calling load() on a miss."""
+    with LISTING_CACHE_LOCK:
+        data = LISTING_CACHE.get(etag)
+    if data is None:
+        data = load()
+        with LISTING_CACHE_LOCK:
+            LISTING_CACHE[etag] = data
+    return data
 
 
-def create_doc(collection_name, data):
-    """Create a new document."""
-    data['createdAt'] = datetime.utcnow().isoformat()
-    data['updatedAt'] = datetime.utcnow().isoformat()
-    doc_ref = db.collection(COLLECTIONS[collection_name]).document()
-    doc_ref.set(data)
+def load_listing(collection_name, project_id=None):
+    """Read a collection listing for the current request, paginated when ?limit= is given."""
+    fields = requested_fields()
+    limit = request.args.get('limit', type=int)
+    if limit:
+        items, next_cursor = get_docs_page(
+            collection_name, project_id,
+            limit=max(1, min(limit, MAX_PAGE_SIZE)),
+            after=request.args.get('after'),
+            fields=fields
+        )
+        return {"items": items, "nextCursor": next_cursor}
+    return get_all_docs(collection_name, project_id, fields=fields)
+
+
+def list_docs_response(collection_name, project_id=None):
+    """Respond with a collection listing, from cache when the collection hasn't changed."""
+    etag, count = collection_fingerprint(collection_name, project_id)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    if count > STREAM_LISTING_THRESHOLD and not request.args.get('limit'):
+        return streamed_listing_response(collection_name, project_id, etag)
+    try:
+        data = cached_listing(etag, lambda: load_listing(collection_name, project_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return conditional_jsonify(data, etag=etag)
+
+
+def get_doc(collection_name, doc_id):
+    """Get a single document by ID, served from DOC_CACHE for repeat lookups."""
+    key = (collection_name, doc_id)
+    with DOC_CACHE_LOCK:
+        hit = DOC_CACHE.get(key)
+    if hit is None:
+        hit = (doc_to_dict(COLLECTION_REFS[collection_name].document(doc_id).get()),)
+        with DOC_CACHE_LOCK:
+            DOC_CACHE[key] = hit
+    # Hand out a copy so callers can't mutate the cached dict
+    return dict(hit[0]) if hit[0] is not None else None
+
+
+def forget_doc(collection_name, doc_id):
+    """Drop a document from DOC_CACHE after writing it."""
+    with DOC_CACHE_LOCK:
+        DOC_CACHE.pop((collection_name, doc_id), None)
+
+
+def create_doc(collection_name, data, batch=None):
+    """Create a new document, or queue it on a write batch if one is given."""
+    now = now_iso()
+    data['createdAt'] = now
+    data['updatedAt'] = now
+    doc_ref = COLLECTION_REFS[collection_name].document()
+    if batch is not None:
+        batch.set(doc_ref, data)
+    else:
+        doc_ref.set(data)
     data['id'] = doc_ref.id
     return data
 
 
 def update_doc(collection_name, doc_id, data):
-    """Update an existing document."""
-    data['updatedAt'] = datetime.utcnow().isoformat()
-    db.collection(COLLECTIONS[collection_name]).document(doc_id).update(data)
-    return get_doc(collection_name, doc_id)
+    """Update an existing document and return the fields written (not re-read)."""
+    data['updatedAt'] = now_iso()
+    COLLECTION_REFS[collection_name].document(doc_id).update(data)
+    forget_doc(collection_name, doc_id)
+    data['id'] = doc_id
+    return data
+
+
+def write_in_batches(items, write):
+    """Apply write(batch, item) to each item, committing one batch per FIRESTORE_BATCH_LIMIT writes."""
+    items = list(items)
+    for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for item in items[start:start + FIRESTORE_BATCH_LIMIT]:
+            write(batch, item)
+        batch.commit()
 
 
 def delete_doc(collection_name, doc_id):
     """Delete a document."""
-    db.collection(COLLECTIONS[collection_name]).document(doc_id).delete()
+    COLLECTION_REFS[collection_name].document(doc_id).delete()
+    forget_doc(collection_name, doc_id)
     return True
 
 
+# ============== AI Prompts ==============
+
+RESEARCH_SYSTEM_PROMPT = """You are a documentary research assistant. Provide comprehensive background research with real source links. Always format URLs as markdown links that can be clicked. Focus on factual, verifiable information from credible sources. When reference documents are provided, incorporate their information and expand upon it."""
+
+INTERVIEW_SYSTEM_PROMPT = """You are a documentary interview specialist. Generate thoughtful, open-ended questions that elicit detailed stories and insights. Focus on emotional moments, specific details, and unique perspectives."""
+
+SCRIPT_OUTLINE_SYSTEM_PROMPT = """You are a documentary scriptwriter. Create detailed episode outlines with clear acts, narrative arcs, and visual storytelling elements."""
+
+QUICKTURE_SCRIPT_SYSTEM_PROMPT = """You are a professional documentary script writer creating scripts optimized for AI-assisted editing tools like Quickture.
+
+## QUICKTURE-COMPATIBLE SCRIPT FORMAT
+
+Create a detailed documentary script that includes:
+
+1. **HEADER SECTION**
+   - Episode title and number
+   - Target duration
+   - Style/tone notes for editors
+
+2. **SCENE BREAKDOWN** (use this format for each scene):
+   ```
+   SCENE [NUMBER]: [SCENE TITLE]
+   Duration: [estimated time]
+   Location: [setting]
+   Mood: [emotional tone]
+
+   VISUAL:
+   [Description of what we see - B-roll, interviews, graphics]
+
+   AUDIO:
+   [Narration, interview soundbites, ambient sound, music cues]
+
+   NARRATION:
+   "[Exact narration text if any]"
+
+   INTERVIEW BITES:
+   - [Subject name]: "[Key quote or topic to cover]"
+
+   B-ROLL NEEDED:
+   - [List of specific shots needed]
+
+   GRAPHICS/TEXT:
+   - [Any lower thirds, titles, or info graphics]
+
+   TRANSITION:
+   [How this scene connects to the next]
+   ```
+
+3. **SHOT LIST SUMMARY**
+   - Numbered list of all shots with descriptions
+   - Technical notes (wide/close, handheld/tripod, etc.)
+
+4. **INTERVIEW GUIDE**
+   - Questions for each subject
+   - Key points to cover
+
+5. **MUSIC/SOUND DESIGN NOTES**
+   - Mood suggestions per scene
+   - Transition audio cues
+
+## REQUIREMENTS
+- Be specific and actionable for editors
+- Include timing estimates for pacing
+- Mark emotional beats and story arc moments
+- Note any archival footage or graphics needed
+- Keep narration concise and documentary-style
+"""
+
+SHOT_IDEAS_SYSTEM_PROMPT = """You are a documentary cinematographer. Suggest creative, visually compelling shot ideas with specific camera movements, angles, and equipment."""
+
+EXPAND_TOPIC_SYSTEM_PROMPT = """You are a documentary story consultant. Help explore topics by suggesting angles, themes, narrative approaches, and key elements to investigate."""
+
+GENERATE_TOPICS_SYSTEM_PROMPT = """You are a documentary series planner. Generate compelling episode topics that would make a cohesive documentary series.
+
+IMPORTANT: Respond ONLY with a JSON array of episode objects. No markdown, no explanation, just valid JSON.
+
+Each episode object must have:
+- "title": A compelling episode title (max 60 chars)
+- "description": Brief description of what this episode covers (max 150 chars)
+- "order": Episode number (1, 2, 3, etc.)
+
+Example response format:
+[
+  {"title": "Episode Title Here", "description": "What this episode covers", "order": 1},
+  {"title": "Another Episode", "description": "Description of content", "order": 2}
+]"""
+
+BLUEPRINT_SYSTEM_PROMPT = """You are a documentary production analyst. Analyze the provided content and create a comprehensive project blueprint document.
+
+IMPORTANT: Respond ONLY with a JSON object. No markdown, no explanation, just valid JSON.
+
+The JSON must have:
+- "title": A compelling project title (max 80 chars)
+- "description": A comprehensive description of what this documentary should cover (max 500 chars)
+- "style": The documentary style/approach that fits best (e.g., "investigative journalism", "observational", "personal narrative", "educational", "cinematic")
+- "episodes": An array of episode objects, each with "title", "description", and "order"
+- "blueprintDocument": A detailed markdown document (1500-2500 words) that serves as the project blueprint, including:
+  * Executive Summary
+  * Project Overview and Goals
+  * Target Audience
+  * Visual Style and Tone
+  * Key Themes to Explore
+  * Production Approach
+  * Episode Breakdown with descriptions
+  * Editing Approach (detailed section covering):
+    - Pacing and rhythm guidelines
+    - Transition styles between scenes/segments
+    - Use of B-roll and cutaways
+    - Music and sound design direction
+    - Graphics and text overlay style
+    - Color grading/look recommendations
+    - Interview editing approach (jump cuts vs continuous, etc.)
+    - Narrative structure and story arc editing
+  * Potential Challenges and Considerations
+
+Example response format:
+{
+  "title": "Documentary Title",
+  "description": "What this documentary is about...",
+  "style": "investigative journalism",
+  "episodes": [
+    {"title": "Episode 1 Title", "description": "What this episode covers", "order": 1},
+    {"title": "Episode 2 Title", "description": "What this episode covers", "order": 2}
+  ],
+  "blueprintDocument": "# Project Blueprint\\n\\n## Executive Summary\\n..."
+}"""
+
+
 # ============== AI Functions ==============
 
+def fix_json_strings(json_str):
+    """Fix raw newlines, carriage returns and tabs inside JSON string values by escaping them."""
+    return JSON_STRING_RE.sub(lambda match: match.group(0).translate(JSON_STRING_ESCAPES), json_str)
+
+
+def model_for(system_prompt=""):
+    """Return the shared GenerativeModel carrying system_prompt as its system instruction."""
+    if not system_prompt:
+        return model
+    with SYSTEM_PROMPT_MODELS_LOCK:
+        system_model = SYSTEM_PROMPT_MODELS.get(system_prompt)
+        if system_model is None:
+            system_model = SYSTEM_PROMPT_MODELS[system_prompt] = GenerativeModel(
+                MODEL_NAME, system_instruction=system_prompt
+            )
+    return system_model
+
+
 def generate_ai_response(prompt, system_prompt=""):
     """Generate AI response using Vertex AI."""
     try:
-        full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-        response = model.generate_content(full_prompt)
+        response = model_for(system_prompt).generate_content(prompt)
         return response.text
     except Exception as e:
         return f"AI error: {str(e)}"
 
 
+def generate_ai_response_stream(prompt, system_prompt=""):
+    """Generate AI response using Vertex AI, yielding text as it is produced; errors propagate to the caller."""
+    for chunk in model_for(system_prompt).generate_content(prompt, stream=True):
+        yield chunk.text
+
+
+def ai_result_response(prompt, system_prompt="", stream=False):
+    """Return an AI result as JSON, or as server-sent events when the client asks to stream."""
+    if not stream:
+        return jsonify({"result": generate_ai_response(prompt, system_prompt)})
+
+    def events():
+        try:
+            for text in generate_ai_response_stream(prompt, system_prompt):
+                yield f"data: {orjson.dumps({'text': text}).decode()}\n\n"
+        except Exception as e:
+            # A separate event type, so clients can't mistake the failure for generated text
+            print(f"AI stream error: {e}")
+            yield f"event: error\ndata: {orjson.dumps({'error': f'AI error: {e}'}).decode()}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 def generate_grounded_research(prompt, system_prompt=""):
     """Placeholder - AI research functionality disabled in this build."""
     return {
@@ -132,8 +831,7 @@ def generate_grounded_research(prompt, system_prompt=""):
 
 def extract_urls(text):
     """Extract URLs from text, limited to MAX_URLS_PER_QUERY."""
-    url_pattern = r'https?://[^\s<>\[\]()"\']+'
-    urls = re.findall(url_pattern, text)
+    urls = URL_RE.findall(text)
     cleaned_urls = []
     for url in urls:
         url = url.rstrip('.,;:!?)')
@@ -146,15 +844,12 @@ def extract_urls(text):
 def validate_url(url, timeout=3):
     """Check if a URL is accessible (returns True if reachable)."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        response = HTTP_SESSION.head(url, timeout=timeout, allow_redirects=True)
         return response.status_code < 400
     except:
         # Try GET if HEAD fails (some servers don't support HEAD)
         try:
-            response = requests.get(url, headers=headers, timeout=timeout, stream=True)
+            response = HTTP_SESSION.get(url, timeout=timeout, stream=True)
             response.close()
             return response.status_code < 400
         except:
@@ -163,20 +858,38 @@ def validate_url(url, timeout=3):
 
 def filter_valid_urls(urls, max_to_check=5):
     """Filter URLs to only include valid, accessible ones (limited to prevent timeout)."""
-    valid_urls = []
-    checked = 0
-    for url in urls:
-        if checked >= max_to_check:
-            break
-        if len(valid_urls) >= 3:  # Stop once we have enough valid URLs
-            break
-        if validate_url(url):
-            valid_urls.append(url)
+    # Check candidates concurrently so the wait is one timeout, not one per URL
+    candidates = urls[:max_to_check]
+    futures = {IO_EXECUTOR.submit(validate_url, url): index for index, url in enumerate(candidates)}
+    valid_indexes = []
+    for future in as_completed(futures):
+        url = candidates[futures[future]]
+        if future.result():
+            valid_indexes.append(futures[future])
             print(f"✓ Valid URL: {url[:60]}...")
         else:
             print(f"✗ Invalid URL: {url[:60]}...")
-        checked += 1
-    return valid_urls
+        if len(valid_indexes) >= 3:  # Stop once we have enough valid URLs
+            for pending in futures:
+                pending.cancel()
+            break
+    return [candidates[index] for index in sorted(valid_indexes)]
+
+
+def render_pdf_in_pool(html_content, base_url=None, css=None):
+    """Render HTML to PDF in the PDF process pool so WeasyPrint's CPU work doesn't block this worker."""
+    pool = pdf_worker.PDF_POOL
+    try:
+        return pool.submit(render_pdf, html_content, base_url, css).result()
+    except BrokenProcessPool:
+        print("[WARN] PDF pool broken (render process died), starting a new one")
+
+    try:
+        return pdf_worker.replace_pdf_pool(pool).submit(render_pdf, html_content, base_url, css).result()
+    except BrokenProcessPool:
+        # Last resort for this call only; the next call gets a fresh pool again
+        print("[WARN] PDF pool unavailable, rendering in-process")
+        return render_pdf(html_content, base_url, css)
 
 
 def convert_to_pdf(html_content, url):
@@ -190,21 +903,84 @@ def convert_to_pdf(html_content, url):
                 f'<head><base href="{base_url}">',
                 1
             )
-        html = HTML(string=html_content, base_url=base_url)
-        pdf_bytes = html.write_pdf()
-        return pdf_bytes
+        return render_pdf_in_pool(html_content, base_url)
     except Exception as e:
         print(f"PDF conversion error for {url}: {e}")
         return None
 
 
-def download_and_store(url, bucket_name, project_id, research_id):
-    """Download a URL, convert to PDF, and store in GCS bucket."""
+def store_capture(bucket, blob_path, data, content_type, overwrite=False):
+    """Upload captured source bytes, keeping any object already at blob_path unless overwrite is set."""
+    blob = bucket.blob(blob_path)
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT, allow_redirects=True)
+        blob.upload_from_string(
+            data,
+            content_type=content_type,
+            if_generation_match=None if overwrite else 0,
+            timeout=60
+        )
+    except PreconditionFailed:
+        print(f"Source already stored, keeping existing object: {blob_path}")
+
+
+def url_cache_ref(url):
+    """Firestore doc in the url_cache collection recording where a URL was last captured."""
+    return COLLECTION_REFS['url_cache'].document(hashlib.md5(url.encode()).hexdigest())
+
+
+def reuse_cached_download(url, cached, bucket, project_id, research_id, writes=None):
+    """Store a recently captured URL for this project by copying the existing GCS object.
+
+    Skips the HTTP fetch and PDF render; returns None when the url_cache snapshot isn't usable.
+    """
+    if not cached.exists:
+        return None
+    entry = cached.to_dict()
+    cutoff = (datetime.now(timezone.utc).replace(tzinfo=None) - URL_CACHE_MAX_AGE).isoformat()
+    if entry.get('cachedAt', '') < cutoff:
+        return None
+
+    # Objects live under the owning project's prefix; copy so each project's cleanup stays independent
+    source_path = entry['gcsPath']
+    blob_path = f"{project_id}/{source_path.split('/', 1)[-1]}"
+    try:
+        if blob_path == source_path:
+            if not bucket.blob(blob_path).exists():
+                return None
+        else:
+            bucket.copy_blob(bucket.blob(source_path), bucket, blob_path)
+    except NotFound:
+        return None
+
+    result = {
+        "url": url,
+        "title": entry.get('title', ''),
+        "status": "success",
+        "gcsPath": blob_path,
+        "size_bytes": entry.get('sizeBytes', 0),
+        "filename": entry.get('filename', ''),
+        "cached": True
+    }
+    create_source_document_asset(project_id, research_id, result, writes=writes)
+    return result
+
+
+def download_and_store(url, bucket_name, project_id, research_id, writes=None):
+    """Download a URL, convert to PDF, and store in GCS bucket.
+
+    Firestore writes (asset row, url_cache entry) are appended to writes as (ref, data)
+    pairs when a list is given, for the caller to commit; otherwise they're made directly.
+    """
+    try:
+        bucket = get_bucket(bucket_name)
+        cache_entry = url_cache_ref(url).get()
+        cached_result = reuse_cached_download(url, cache_entry, bucket, project_id, research_id, writes=writes)
+        if cached_result:
+            return cached_result
+        # Refreshing a stale capture replaces the object; otherwise never overwrite one already stored
+        overwrite = cache_entry.exists
+
+        response = HTTP_SESSION.get(url, timeout=DOWNLOAD_TIMEOUT, allow_redirects=True)
         response.raise_for_status()
 
         content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
@@ -213,7 +989,7 @@ def download_and_store(url, bucket_name, project_id, research_id):
         path = parsed_url.path.strip('/')
         if path:
             base_filename = path.split('/')[-1]
-            base_filename = re.sub(r'[^\w\-.]', '_', base_filename)
+            base_filename = UNSAFE_FILENAME_CHARS_RE.sub('_', base_filename)
         else:
             base_filename = parsed_url.netloc.replace('.', '_')
 
@@ -222,19 +998,17 @@ def download_and_store(url, bucket_name, project_id, research_id):
 
         title = base_filename.replace('_', ' ').title()
         if 'html' in content_type:
-            title_match = re.search(r'<title[^>]*>([^<]+)</title>', response.text, re.IGNORECASE)
+            title_match = HTML_TITLE_RE.search(response.text)
             if title_match:
                 title = title_match.group(1).strip()
 
         url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-        bucket = storage_client.bucket(bucket_name)
 
         result = {"url": url, "title": title, "status": "success"}
 
         if content_type == 'application/pdf':
             blob_path = f"{project_id}/{url_hash}_{base_filename}.pdf"
-            blob = bucket.blob(blob_path)
-            blob.upload_from_string(response.content, content_type='application/pdf')
+            store_capture(bucket, blob_path, response.content, 'application/pdf', overwrite)
             result["gcsPath"] = blob_path
             result["size_bytes"] = len(response.content)
             result["filename"] = f"{base_filename}.pdf"
@@ -243,29 +1017,39 @@ def download_and_store(url, bucket_name, project_id, research_id):
             pdf_bytes = convert_to_pdf(response.text, url)
             if pdf_bytes:
                 blob_path = f"{project_id}/{url_hash}_{base_filename}.pdf"
-                blob = bucket.blob(blob_path)
-                blob.upload_from_string(pdf_bytes, content_type='application/pdf')
+                store_capture(bucket, blob_path, pdf_bytes, 'application/pdf', overwrite)
                 result["gcsPath"] = blob_path
                 result["size_bytes"] = len(pdf_bytes)
                 result["filename"] = f"{base_filename}.pdf"
             else:
                 blob_path = f"{project_id}/{url_hash}_{base_filename}.html"
-                blob = bucket.blob(blob_path)
-                blob.upload_from_string(response.content, content_type='text/html')
+                store_capture(bucket, blob_path, response.content, 'text/html', overwrite)
                 result["gcsPath"] = blob_path
                 result["size_bytes"] = len(response.content)
                 result["filename"] = f"{base_filename}.html"
         else:
             ext = content_type.split('/')[-1] if '/' in content_type else 'bin'
             blob_path = f"{project_id}/{url_hash}_{base_filename}.{ext}"
-            blob = bucket.blob(blob_path)
-            blob.upload_from_string(response.content, content_type=content_type)
+            store_capture(bucket, blob_path, response.content, content_type, overwrite)
             result["gcsPath"] = blob_path
             result["size_bytes"] = len(response.content)
             result["filename"] = f"{base_filename}.{ext}"
 
         if result.get("gcsPath"):
-            create_source_document_asset(project_id, research_id, result)
+            create_source_document_asset(project_id, research_id, result, writes=writes)
+            cache_data = {
+                "url": url,
+                "gcsPath": result["gcsPath"],
+                "title": title,
+                "filename": result["filename"],
+                "sizeBytes": result["size_bytes"],
+                "contentType": content_type,
+                "cachedAt": now_iso()
+            }
+            if writes is not None:
+                writes.append((url_cache_ref(url), cache_data))
+            else:
+                url_cache_ref(url).set(cache_data)
 
         return result
 
@@ -273,9 +1057,10 @@ def download_and_store(url, bucket_name, project_id, research_id):
         return {"url": url, "status": "error", "error": str(e)}
 
 
-def create_source_document_asset(project_id, research_id, doc_result):
-    """Create a Firestore asset entry for a downloaded source document."""
+def create_source_document_asset(project_id, research_id, doc_result, writes=None):
+    """Create a Firestore asset entry for a downloaded source document, or append it to writes."""
     try:
+        now = now_iso()
         asset_data = {
             "projectId": project_id,
             "researchId": research_id,
@@ -287,43 +1072,28 @@ def create_source_document_asset(project_id, research_id, doc_result):
             "isSourceDocument": True,
             "sizeBytes": doc_result.get("size_bytes", 0),
             "filename": doc_result.get("filename", ""),
-            "createdAt": datetime.utcnow().isoformat(),
-            "updatedAt": datetime.utcnow().isoformat()
+            "createdAt": now,
+            "updatedAt": now
         }
-        doc_ref = db.collection(COLLECTIONS['assets']).document()
-        doc_ref.set(asset_data)
+        doc_ref = COLLECTION_REFS['assets'].document()
+        if writes is not None:
+            writes.append((doc_ref, asset_data))
+        else:
+            doc_ref.set(asset_data)
         print(f"Created source document asset: {doc_result.get('title')}")
     except Exception as e:
         print(f"Error creating asset: {e}")
 
 
-def process_source_documents_async(urls, bucket_name, project_id, research_id):
-    """Background thread to download and process source documents."""
-    print(f"Starting download of {len(urls)} sources for research {research_id}")
-    success_count = 0
-    error_count = 0
-    for url in urls:
-        try:
-            print(f"Downloading: {url[:80]}...")
-            result = download_and_store(url, bucket_name, project_id, research_id)
-            if result.get("status") == "error":
-                print(f"Failed to download {url}: {result.get('error')}")
-                error_count += 1
-            else:
-                print(f"Successfully downloaded: {result.get('title', url)}")
-                success_count += 1
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-            error_count += 1
-    print(f"Download complete: {success_count} success, {error_count} errors")
-
-
 def ensure_bucket_exists(bucket_name):
-    """Create bucket if it doesn't exist."""
+    """Create bucket if it doesn't exist (checked once per process once it succeeds)."""
+    if bucket_name in VERIFIED_BUCKETS:
+        return True
     try:
-        bucket = storage_client.bucket(bucket_name)
+        bucket = get_bucket(bucket_name)
         if not bucket.exists():
-            bucket = storage_client.create_bucket(bucket_name, location=LOCATION)
+            storage_client.create_bucket(bucket_name, location=LOCATION)
+        VERIFIED_BUCKETS.add(bucket_name)
         return True
     except Exception as e:
         print(f"Bucket error: {e}")
@@ -332,6 +1102,18 @@ def ensure_bucket_exists(bucket_name):
 
 # ============== Routes ==============
 
+@app.after_request
+def add_conditional_get_headers(response):
+    """Give JSON GET responses without their own ETag a content-hash one, answering 304 when unchanged."""
+    if (request.method == 'GET' and response.status_code == 200
+            and response.mimetype == 'application/json'
+            and not response.is_streamed and 'ETag' not in response.headers):
+        response.headers.setdefault('Cache-Control', 'private, no-cache')
+        response.add_etag()
+        response = response.make_conditional(request)
+    return response
+
+
 @app.route("/")
 def index():
     """Render the main app interface."""
@@ -348,9 +1130,19 @@ def health():
 
 @app.route("/api/projects", methods=["GET"])
 def get_projects():
-    """Get all projects."""
-    projects = get_all_docs('projects')
-    return jsonify(projects)
+    """Get all projects, with per-collection item counts when ?include=counts is given."""
+    if request.args.get('include') != 'counts':
+        return list_docs_response('projects')
+
+    projects = get_all_docs('projects', fields=requested_fields())
+    pairs = [(project['id'], name) for project in projects for name in PROJECT_DATA_COLLECTIONS]
+    counts = IO_EXECUTOR.map(lambda pair: count_docs(pair[1], pair[0]), pairs)
+    by_project = {}
+    for (project_id, name), count in zip(pairs, counts):
+        by_project.setdefault(project_id, {})[name] = count
+    for project in projects:
+        project['counts'] = by_project.get(project['id'], {})
+    return conditional_jsonify(projects)
 
 
 @app.route("/api/projects", methods=["POST"])
@@ -358,6 +1150,15 @@ def create_project():
     """Create a new project."""
     data = request.get_json()
     project = create_doc('projects', data)
+    blueprint_file = project.get('blueprintFile')
+    if blueprint_file and blueprint_file.get('status') == 'pending' and blueprint_file.get('path'):
+        # Read the render outcome only after the project exists: record_blueprint_status writes the
+        # outcome before querying for projects, so a render finishing now is seen by one side or the other
+        render = blueprint_render_ref(blueprint_file['path']).get()
+        status = render.to_dict().get('status') if render.exists else None
+        if status in ('ready', 'failed'):
+            update_doc('projects', project['id'], {'blueprintFile.status': status})
+            blueprint_file['status'] = status
     return jsonify(project), 201
 
 
@@ -378,50 +1179,76 @@ def update_project(project_id):
     return jsonify(project)
 
 
+@app.route("/api/projects/<project_id>/bundle", methods=["GET"])
+def get_project_bundle(project_id):
+    """Get all data for a project in one response, querying collections concurrently."""
+    futures = {
+        name: IO_EXECUTOR.submit(get_all_docs, name, project_id)
+        for name in PROJECT_DATA_COLLECTIONS
+    }
+    bundle = {name: future.result() for name, future in futures.items()}
+    bundle['series'].sort(key=lambda s: s.get('order', 0))
+    return conditional_jsonify(bundle)
+
+
 @app.route("/api/projects/<project_id>", methods=["DELETE"])
 def delete_project(project_id):
     """Delete a project and all related data."""
-    # Delete all related data first
-    for collection in ['episodes', 'series', 'research', 'interviews', 'shots', 'assets', 'scripts']:
-        docs = db.collection(COLLECTIONS[collection]).where('projectId', '==', project_id).stream()
-        for doc in docs:
-            doc.reference.delete()
+    # Delete all related data first; only references are needed, so skip reading fields
+    related = [
+        (collection, doc.reference)
+        for collection in PROJECT_DATA_COLLECTIONS
+        for doc in COLLECTION_REFS[collection].where('projectId', '==', project_id).select([]).stream()
+    ]
+    write_in_batches(related, lambda batch, item: batch.delete(item[1]))
+    for collection, ref in related:
+        forget_doc(collection, ref.id)
 
     # Delete the project itself
     delete_doc('projects', project_id)
     return jsonify({"success": True})
 
 
-# ============== Episode Routes ==============
+# ============== Collection CRUD Routes ==============
 
-@app.route("/api/projects/<project_id>/episodes", methods=["GET"])
-def get_episodes(project_id):
-    """Get all episodes for a project."""
-    episodes = get_all_docs('episodes', project_id)
-    return jsonify(episodes)
+def register_crud_routes(collection_name, singular, list_route=True, delete_route=True):
+    """Register the standard list/create/update/delete routes for a project collection.
 
+    Endpoint names match the hand-written routes they replace (get_episodes, create_episode, ...).
+    Collections needing custom list or delete behaviour opt out and define those routes themselves.
+    """
+    def list_items(project_id):
+        return list_docs_response(collection_name, project_id)
 
-@app.route("/api/episodes", methods=["POST"])
-def create_episode():
-    """Create a new episode."""
-    data = request.get_json()
-    episode = create_doc('episodes', data)
-    return jsonify(episode), 201
+    def create_item():
+        return jsonify(create_doc(collection_name, request.get_json())), 201
 
+    def update_item(item_id):
+        return jsonify(update_doc(collection_name, item_id, request.get_json()))
 
-@app.route("/api/episodes/<episode_id>", methods=["PUT"])
-def update_episode(episode_id):
-    """Update an episode."""
-    data = request.get_json()
-    episode = update_doc('episodes', episode_id, data)
-    return jsonify(episode)
+    def delete_item(item_id):
+        delete_doc(collection_name, item_id)
+        return jsonify({"success": True})
 
+    if list_route:
+        app.add_url_rule(f"/api/projects/<project_id>/{collection_name}", f"get_{collection_name}",
+                         list_items, methods=["GET"])
+    app.add_url_rule(f"/api/{collection_name}", f"create_{singular}", create_item, methods=["POST"])
+    app.add_url_rule(f"/api/{collection_name}/<item_id>", f"update_{singular}", update_item, methods=["PUT"])
+    if delete_route:
+        app.add_url_rule(f"/api/{collection_name}/<item_id>", f"delete_{singular}", delete_item,
+                         methods=["DELETE"])
 
-@app.route("/api/episodes/<episode_id>", methods=["DELETE"])
-def delete_episode(episode_id):
-    """Delete an episode."""
-    delete_doc('episodes', episode_id)
-    return jsonify({"success": True})
+
+register_crud_routes('episodes', 'episode')
+register_crud_routes('research', 'research')
+register_crud_routes('interviews', 'interview')
+register_crud_routes('shots', 'shot')
+register_crud_routes('scripts', 'script')
+# Series sort by their order field and ungroup episodes on delete
+register_crud_routes('series', 'series', list_route=False, delete_route=False)
+# Asset deletes also remove the stored file
+register_crud_routes('assets', 'asset', delete_route=False)
 
 
 # ============== Series Routes ==============
@@ -429,161 +1256,35 @@ def delete_episode(episode_id):
 @app.route("/api/projects/<project_id>/series", methods=["GET"])
 def get_series(project_id):
     """Get all series for a project."""
-    series = get_all_docs('series', project_id)
-    # Sort by order field
-    series.sort(key=lambda s: s.get('order', 0))
-    return jsonify(series)
+    etag, _ = collection_fingerprint('series', project_id)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
 
+    def load():
+        series = get_all_docs('series', project_id, fields=requested_fields())
+        # Sort by order field in Python: a Firestore order_by would drop series saved without one
+        series.sort(key=lambda s: s.get('order', 0))
+        return series
 
-@app.route("/api/series", methods=["POST"])
-def create_series():
-    """Create a new series."""
-    data = request.get_json()
-    series = create_doc('series', data)
-    return jsonify(series), 201
-
-
-@app.route("/api/series/<series_id>", methods=["PUT"])
-def update_series(series_id):
-    """Update a series."""
-    data = request.get_json()
-    series = update_doc('series', series_id, data)
-    return jsonify(series)
+    return conditional_jsonify(cached_listing(etag, load), etag=etag)
 
 
 @app.route("/api/series/<series_id>", methods=["DELETE"])
 def delete_series(series_id):
     """Delete a series and ungroup its episodes."""
     # Remove seriesId from all episodes in this series
-    episodes = db.collection(COLLECTIONS['episodes']).where('seriesId', '==', series_id).stream()
-    for ep in episodes:
-        ep.reference.update({'seriesId': None, 'updatedAt': datetime.utcnow().isoformat()})
+    episode_refs = [ep.reference for ep in COLLECTION_REFS['episodes'].where('seriesId', '==', series_id).select([]).stream()]
+    ungrouped = {'seriesId': None, 'updatedAt': now_iso()}
+    write_in_batches(episode_refs, lambda batch, ref: batch.update(ref, ungrouped))
+    for ref in episode_refs:
+        forget_doc('episodes', ref.id)
 
     delete_doc('series', series_id)
     return jsonify({"success": True})
 
 
-# ============== Research Routes ==============
-
-@app.route("/api/projects/<project_id>/research", methods=["GET"])
-def get_research(project_id):
-    """Get all research for a project."""
-    research = get_all_docs('research', project_id)
-    return jsonify(research)
-
-
-@app.route("/api/research", methods=["POST"])
-def create_research():
-    """Create a new research item."""
-    data = request.get_json()
-    research = create_doc('research', data)
-    return jsonify(research), 201
-
-
-@app.route("/api/research/<research_id>", methods=["PUT"])
-def update_research(research_id):
-    """Update a research item."""
-    data = request.get_json()
-    research = update_doc('research', research_id, data)
-    return jsonify(research)
-
-
-@app.route("/api/research/<research_id>", methods=["DELETE"])
-def delete_research(research_id):
-    """Delete a research item."""
-    delete_doc('research', research_id)
-    return jsonify({"success": True})
-
-
-# ============== Interview Routes ==============
-
-@app.route("/api/projects/<project_id>/interviews", methods=["GET"])
-def get_interviews(project_id):
-    """Get all interviews for a project."""
-    interviews = get_all_docs('interviews', project_id)
-    return jsonify(interviews)
-
-
-@app.route("/api/interviews", methods=["POST"])
-def create_interview():
-    """Create a new interview."""
-    data = request.get_json()
-    interview = create_doc('interviews', data)
-    return jsonify(interview), 201
-
-
-@app.route("/api/interviews/<interview_id>", methods=["PUT"])
-def update_interview(interview_id):
-    """Update an interview."""
-    data = request.get_json()
-    interview = update_doc('interviews', interview_id, data)
-    return jsonify(interview)
-
-
-@app.route("/api/interviews/<interview_id>", methods=["DELETE"])
-def delete_interview(interview_id):
-    """Delete an interview."""
-    delete_doc('interviews', interview_id)
-    return jsonify({"success": True})
-
-
-# ============== Shot Routes ==============
-
-@app.route("/api/projects/<project_id>/shots", methods=["GET"])
-def get_shots(project_id):
-    """Get all shots for a project."""
-    shots = get_all_docs('shots', project_id)
-    return jsonify(shots)
-
-
-@app.route("/api/shots", methods=["POST"])
-def create_shot():
-    """Create a new shot."""
-    data = request.get_json()
-    shot = create_doc('shots', data)
-    return jsonify(shot), 201
-
-
-@app.route("/api/shots/<shot_id>", methods=["PUT"])
-def update_shot(shot_id):
-    """Update a shot."""
-    data = request.get_json()
-    shot = update_doc('shots', shot_id, data)
-    return jsonify(shot)
-
-
-@app.route("/api/shots/<shot_id>", methods=["DELETE"])
-def delete_shot(shot_id):
-    """Delete a shot."""
-    delete_doc('shots', shot_id)
-    return jsonify({"success": True})
-
-
 # ============== Asset Routes ==============
 
-@app.route("/api/projects/<project_id>/assets", methods=["GET"])
-def get_assets(project_id):
-    """Get all assets for a project."""
-    assets = get_all_docs('assets', project_id)
-    return jsonify(assets)
-
-
-@app.route("/api/assets", methods=["POST"])
-def create_asset():
-    """Create a new asset."""
-    data = request.get_json()
-    asset = create_doc('assets', data)
-    return jsonify(asset), 201
-
-
-@app.route("/api/assets/<asset_id>", methods=["PUT"])
-def update_asset(asset_id):
-    """Update an asset."""
-    data = request.get_json()
-    asset = update_doc('assets', asset_id, data)
-    return jsonify(asset)
-
-
 @app.route("/api/assets/<asset_id>", methods=["DELETE"])
 def delete_asset(asset_id):
     """Delete an asset and its GCS file if it exists."""
@@ -591,7 +1292,7 @@ def delete_asset(asset_id):
     asset = get_doc('assets', asset_id)
     if asset and asset.get('gcsPath'):
         try:
-            bucket = storage_client.bucket(STORAGE_BUCKET)
+            bucket = get_bucket(STORAGE_BUCKET)
             blob = bucket.blob(asset['gcsPath'])
             if blob.exists():
                 blob.delete()
@@ -627,26 +1328,24 @@ def upload_asset_file():
         return jsonify({"error": "Project ID is required"}), 400
 
     try:
-        # Read file content
-        file_content = file.read()
-        file_size = len(file_content)
+        # Hash and measure the upload in 1 MiB reads rather than loading it into memory
+        file_hash, file_size = hash_stream(file.stream)
 
         # Determine content type
         content_type = file.content_type or 'application/octet-stream'
 
         # Generate safe filename
         original_filename = file.filename
-        safe_filename = re.sub(r'[^\w\-.]', '_', original_filename)
+        safe_filename = UNSAFE_FILENAME_CHARS_RE.sub('_', original_filename)
 
         # Generate unique path
-        file_hash = hashlib.md5(file_content).hexdigest()[:8]
-        blob_path = f"assets/{project_id}/{file_hash}_{safe_filename}"
+        blob_path = f"assets/{project_id}/{file_hash[:8]}_{safe_filename}"
 
-        # Upload to GCS
+        # Stream the spooled upload straight to GCS
         ensure_bucket_exists(STORAGE_BUCKET)
-        bucket = storage_client.bucket(STORAGE_BUCKET)
+        bucket = get_bucket(STORAGE_BUCKET)
         blob = bucket.blob(blob_path)
-        blob.upload_from_string(file_content, content_type=content_type)
+        blob.upload_from_file(file.stream, size=file_size, content_type=content_type, rewind=True)
 
         print(f"Uploaded asset file: {blob_path} ({file_size} bytes)")
 
@@ -662,8 +1361,7 @@ def upload_asset_file():
             "mimeType": content_type,
             "sizeBytes": file_size,
             "hasFile": True,
-            "isResearchDocument": is_research_document,
-            "updatedAt": datetime.utcnow().isoformat()
+            "isResearchDocument": is_research_document
         }
 
         # Add optional entity associations for research documents
@@ -678,16 +1376,14 @@ def upload_asset_file():
             existing = get_doc('assets', asset_id)
             if existing and existing.get('gcsPath') and existing['gcsPath'] != blob_path:
                 try:
-                    old_blob = bucket.blob(existing['gcsPath'])
-                    if old_blob.exists():
-                        old_blob.delete()
+                    # delete() alone is one round trip; a missing blob just raises NotFound
+                    bucket.blob(existing['gcsPath']).delete()
                 except:
                     pass
 
             asset = update_doc('assets', asset_id, asset_data)
         else:
             # Create new asset
-            asset_data['createdAt'] = datetime.utcnow().isoformat()
             asset = create_doc('assets', asset_data)
 
         return jsonify({
@@ -705,10 +1401,7 @@ def upload_asset_file():
 
 @app.route("/api/assets/<asset_id>/file", methods=["GET"])
 def get_asset_file(asset_id):
-    """Download an asset's file using streaming for all sizes."""
-    from flask import stream_with_context
-    import sys
-
+    """Download an asset's file via a signed GCS redirect, or by streaming it with ?stream=1."""
     print(f"Download request for asset: {asset_id}", file=sys.stderr)
 
     asset = get_doc('assets', asset_id)
@@ -724,61 +1417,71 @@ def get_asset_file(asset_id):
     print(f"Attempting to access GCS path: {gcs_path}", file=sys.stderr)
 
     try:
-        bucket = storage_client.bucket(STORAGE_BUCKET)
-        blob = bucket.blob(gcs_path)
+        bucket = get_bucket(STORAGE_BUCKET)
 
-        print(f"Checking if blob exists...", file=sys.stderr)
-        if not blob.exists():
+        # One metadata request both checks existence and loads the size
+        blob = bucket.get_blob(gcs_path)
+        if blob is None:
             print(f"Blob does not exist: {gcs_path}", file=sys.stderr)
             return jsonify({"error": "File not found in storage"}), 404
 
         content_type = asset.get('mimeType', 'application/octet-stream')
         filename = asset.get('filename', 'download')
-
-        # Get file size
-        print(f"Reloading blob metadata...", file=sys.stderr)
-        blob.reload()
         file_size = blob.size
 
-        print(f"Streaming asset file: {gcs_path} ({file_size} bytes)", file=sys.stderr)
+        # Let GCS serve the bytes; ?stream=1 (or a signing failure) proxies them through here instead
+        if request.args.get('stream') != '1':
+            try:
+                return redirect(signed_download_url(blob, filename, content_type), code=302)
+            except Exception as e:
+                print(f"Signed URL unavailable, streaming instead: {e}", file=sys.stderr)
+
+        # Single byte ranges let clients resume or split a download; anything else gets the whole file
+        byte_range = parse_byte_range(request.headers.get('Range'), file_size)
+        if byte_range is None:
+            response = Response(status=416)
+            response.headers['Content-Range'] = f'bytes */{file_size}'
+            return response
+        start, end, partial = byte_range
+        length = end - start + 1
 
-        # Stream using GCS range requests - this works within Cloud Run's response limits
-        # Each chunk is fetched separately, avoiding memory issues
-        chunk_size = 5 * 1024 * 1024  # 5MB chunks for faster streaming
+        print(f"Streaming asset file: {gcs_path} ({start}-{end} of {file_size} bytes)", file=sys.stderr)
 
         def generate():
-            """Generator that yields file chunks using range requests."""
-            offset = 0
-            chunk_num = 0
-            while offset < file_size:
-                end = min(offset + chunk_size, file_size)
-                try:
-                    # GCS range requests are inclusive on both ends
-                    chunk = blob.download_as_bytes(start=offset, end=end - 1)
-                    chunk_num += 1
-                    if chunk_num % 10 == 0:  # Log every 10 chunks
-                        print(f"Chunk {chunk_num}: {offset}-{end} of {file_size} ({100*end/file_size:.1f}%)")
-                    yield chunk
-                    offset = end
-                except Exception as e:
-                    print(f"Error downloading chunk at offset {offset}: {e}")
-                    raise
-
-            print(f"Stream complete: {chunk_num} chunks, {file_size} bytes total")
+            """Generator that yields the requested byte window through one BlobReader pinned to this generation."""
+            remaining = length
+            try:
+                with blob.open('rb', chunk_size=DOWNLOAD_FETCH_SIZE) as reader:
+                    if start:
+                        reader.seek(start)
+                    while remaining > 0:
+                        piece = reader.read(min(DOWNLOAD_YIELD_SIZE, remaining))
+                        if not piece:
+                            break
+                        remaining -= len(piece)
+                        yield piece
+            except Exception as e:
+                print(f"Error streaming {gcs_path}: {e}")
+                raise
+
+            print(f"Stream complete: {length - remaining} bytes total")
 
         # Use chunked transfer encoding for streaming (no Content-Length)
         # This allows Cloud Run to stream without buffering the entire response
         response = Response(
             stream_with_context(generate()),
+            status=206 if partial else 200,
             mimetype=content_type,
         )
         response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response.headers['X-Content-Length'] = str(file_size)  # Hint for client progress
+        response.headers['Accept-Ranges'] = 'bytes'
+        response.headers['X-Content-Length'] = str(length)  # Hint for client progress
+        if partial:
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{file_size}'
         return response
 
     except Exception as e:
         print(f"Error downloading asset file: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
@@ -787,6 +1490,21 @@ def get_asset_file(asset_id):
 CHUNK_SIZE = 10 * 1024 * 1024  # 10MB chunks
 
 
+def create_upload_session(blob_path, content_type, file_size):
+    """Open a GCS resumable upload session the calling browser can PUT to; None if that fails."""
+    try:
+        ensure_bucket_exists(STORAGE_BUCKET)
+        blob = get_bucket(STORAGE_BUCKET).blob(blob_path)
+        return blob.create_resumable_upload_session(
+            content_type=content_type,
+            size=file_size or None,
+            origin=request.headers.get('Origin') or request.host_url.rstrip('/')
+        )
+    except Exception as e:
+        print(f"Resumable session error, falling back to chunk uploads: {e}")
+        return None
+
+
 @app.route("/api/assets/upload/init", methods=["POST"])
 def init_asset_chunked_upload():
     """Initialize a chunked upload session for large asset files."""
@@ -805,17 +1523,21 @@ def init_asset_chunked_upload():
         return jsonify({"error": "Project ID is required"}), 400
 
     # Generate unique upload ID
-    upload_id = hashlib.md5(f"{filename}{project_id}{datetime.utcnow().isoformat()}".encode()).hexdigest()[:16]
+    upload_id = hashlib.md5(f"{filename}{project_id}{now_iso()}".encode()).hexdigest()[:16]
 
     # Generate safe filename and blob path
-    safe_filename = re.sub(r'[^\w\-.]', '_', filename)
+    safe_filename = UNSAFE_FILENAME_CHARS_RE.sub('_', filename)
     blob_path = f"assets/{project_id}/{upload_id}_{safe_filename}"
 
+    # Let the browser PUT chunks straight to GCS; the chunk route stays as the fallback
+    session_uri = create_upload_session(blob_path, content_type, file_size)
+
     print(f"Initialized chunked upload: {upload_id} for {filename} ({file_size} bytes, {total_chunks} chunks)")
 
     return jsonify({
         "uploadId": upload_id,
         "blobPath": blob_path,
+        "sessionUri": session_uri,
         "totalChunks": total_chunks,
         "projectId": project_id,
         "filename": filename,
@@ -839,24 +1561,27 @@ def upload_asset_chunk(upload_id):
         return jsonify({"error": "No chunk data"}), 400
 
     chunk = request.files['chunk']
-    chunk_data = chunk.read()
+    # Werkzeug has already spooled the part; measure it rather than copying it into bytes
+    chunk.stream.seek(0, os.SEEK_END)
+    chunk_size = chunk.stream.tell()
+    chunk.stream.seek(0)
 
     try:
         ensure_bucket_exists(STORAGE_BUCKET)
-        bucket = storage_client.bucket(STORAGE_BUCKET)
+        bucket = get_bucket(STORAGE_BUCKET)
 
         # Store chunk temporarily
         chunk_blob_name = f"uploads/chunks/{upload_id}/chunk_{chunk_index:04d}"
         chunk_blob = bucket.blob(chunk_blob_name)
-        chunk_blob.upload_from_string(chunk_data, content_type='application/octet-stream')
+        chunk_blob.upload_from_file(chunk.stream, size=chunk_size, content_type='application/octet-stream')
 
-        print(f"Uploaded chunk {chunk_index + 1}/{total_chunks} for {upload_id} ({len(chunk_data)} bytes)")
+        print(f"Uploaded chunk {chunk_index + 1}/{total_chunks} for {upload_id} ({chunk_size} bytes)")
 
         return jsonify({
             "status": "uploaded",
             "chunkIndex": chunk_index,
             "totalChunks": total_chunks,
-            "bytesUploaded": len(chunk_data)
+            "bytesUploaded": chunk_size
         })
 
     except Exception as e:
@@ -882,33 +1607,29 @@ def complete_asset_chunked_upload(upload_id):
         return jsonify({"error": "Project ID is required"}), 400
 
     try:
-        bucket = storage_client.bucket(STORAGE_BUCKET)
+        bucket = get_bucket(STORAGE_BUCKET)
 
         # List all chunks
         chunk_blobs = list(bucket.list_blobs(prefix=f"uploads/chunks/{upload_id}/"))
         chunk_blobs.sort(key=lambda b: b.name)
 
-        if not chunk_blobs:
-            return jsonify({"error": "No chunks found for this upload"}), 400
-
-        print(f"Combining {len(chunk_blobs)} chunks for {upload_id}")
+        if chunk_blobs:
+            print(f"Combining {len(chunk_blobs)} chunks for {upload_id}")
 
-        # Combine all chunk data
-        combined_data = b''
-        for cb in chunk_blobs:
-            combined_data += cb.download_as_bytes()
+            # Concatenate server-side; no chunk bytes pass through this instance
+            final_blob = compose_blobs(bucket, chunk_blobs, blob_path, content_type,
+                                       scratch_prefix=f"uploads/compose/{upload_id}/")
+            print(f"Combined file uploaded: {blob_path} ({final_blob.size} bytes)")
 
-        file_size = len(combined_data)
-
-        # Upload combined file to final location
-        final_blob = bucket.blob(blob_path)
-        final_blob.upload_from_string(combined_data, content_type=content_type)
-
-        print(f"Combined file uploaded: {blob_path} ({file_size} bytes)")
+            # Clean up chunks after responding; the final object no longer needs them
+            delete_blobs_concurrently(chunk_blobs, wait=False)
+        else:
+            # The client uploaded straight to GCS through the resumable session
+            final_blob = bucket.get_blob(blob_path)
+            if final_blob is None:
+                return jsonify({"error": "No chunks found for this upload"}), 400
 
-        # Clean up chunks
-        for cb in chunk_blobs:
-            cb.delete()
+        file_size = final_blob.size
 
         # Create or update asset document
         asset_data = {
@@ -921,8 +1642,7 @@ def complete_asset_chunked_upload(upload_id):
             "filename": filename,
             "mimeType": content_type,
             "sizeBytes": file_size,
-            "hasFile": True,
-            "updatedAt": datetime.utcnow().isoformat()
+            "hasFile": True
         }
 
         if asset_id:
@@ -930,14 +1650,12 @@ def complete_asset_chunked_upload(upload_id):
             existing = get_doc('assets', asset_id)
             if existing and existing.get('gcsPath') and existing['gcsPath'] != blob_path:
                 try:
-                    old_blob = bucket.blob(existing['gcsPath'])
-                    if old_blob.exists():
-                        old_blob.delete()
+                    # delete() alone is one round trip; a missing blob just raises NotFound
+                    bucket.blob(existing['gcsPath']).delete()
                 except:
                     pass
             asset = update_doc('assets', asset_id, asset_data)
         else:
-            asset_data['createdAt'] = datetime.utcnow().isoformat()
             asset = create_doc('assets', asset_data)
 
         return jsonify({
@@ -952,7 +1670,7 @@ def complete_asset_chunked_upload(upload_id):
         print(f"Error completing chunked upload: {e}")
         # Try to clean up chunks on error
         try:
-            bucket = storage_client.bucket(STORAGE_BUCKET)
+            bucket = get_bucket(STORAGE_BUCKET)
             for cb in bucket.list_blobs(prefix=f"uploads/chunks/{upload_id}/"):
                 cb.delete()
         except:
@@ -962,21 +1680,31 @@ def complete_asset_chunked_upload(upload_id):
 
 # ============== Research Documents Query Routes ==============
 
+# Research document listings only need what the document cards and the query filters read
+RESEARCH_DOC_FIELDS = [
+    'title', 'type', 'status', 'filename', 'mimeType', 'sizeBytes', 'gcsPath', 'updatedAt',
+    'projectId', 'episodeId', 'seriesId', 'isResearchDocument'
+]
+
+
+def query_research_documents(field, value):
+    """Stream research document assets where field == value, projected to RESEARCH_DOC_FIELDS."""
+    docs_ref = COLLECTION_REFS['assets'].where(
+        field, '==', value
+    ).where(
+        'isResearchDocument', '==', True
+    ).select(RESEARCH_DOC_FIELDS)
+    for doc in docs_ref.stream():
+        doc_data = doc.to_dict()
+        doc_data['id'] = doc.id
+        yield doc_data
+
+
 @app.route("/api/episodes/<episode_id>/research-documents", methods=["GET"])
 def get_episode_research_documents(episode_id):
     """Get all research documents for an episode."""
     try:
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
-            'episodeId', '==', episode_id
-        ).where(
-            'isResearchDocument', '==', True
-        )
-        documents = []
-        for doc in docs_ref.stream():
-            doc_data = doc.to_dict()
-            doc_data['id'] = doc.id
-            documents.append(doc_data)
-        return jsonify(documents)
+        return jsonify(list(query_research_documents('episodeId', episode_id)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -985,17 +1713,7 @@ def get_episode_research_documents(episode_id):
 def get_series_research_documents(series_id):
     """Get all research documents for a series."""
     try:
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
-            'seriesId', '==', series_id
-        ).where(
-            'isResearchDocument', '==', True
-        )
-        documents = []
-        for doc in docs_ref.stream():
-            doc_data = doc.to_dict()
-            doc_data['id'] = doc.id
-            documents.append(doc_data)
-        return jsonify(documents)
+        return jsonify(list(query_research_documents('seriesId', series_id)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1004,19 +1722,12 @@ def get_series_research_documents(series_id):
 def get_project_research_documents(project_id):
     """Get all research documents for a project (project-level only, not episode/series)."""
     try:
-        # Get research documents that are project-level (no episodeId or seriesId)
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
-            'projectId', '==', project_id
-        ).where(
-            'isResearchDocument', '==', True
-        )
-        documents = []
-        for doc in docs_ref.stream():
-            doc_data = doc.to_dict()
-            # Filter to only project-level (no episode or series association)
-            if not doc_data.get('episodeId') and not doc_data.get('seriesId'):
-                doc_data['id'] = doc.id
-                documents.append(doc_data)
+        # Firestore == None never matches a missing field, and project-level docs usually
+        # omit episodeId/seriesId entirely, so this filter has to stay client-side
+        documents = [
+            doc_data for doc_data in query_research_documents('projectId', project_id)
+            if not doc_data.get('episodeId') and not doc_data.get('seriesId')
+        ]
         return jsonify(documents)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1026,17 +1737,7 @@ def get_project_research_documents(project_id):
 def get_all_project_research_documents(project_id):
     """Get all research documents for a project (including episode and series docs)."""
     try:
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
-            'projectId', '==', project_id
-        ).where(
-            'isResearchDocument', '==', True
-        )
-        documents = []
-        for doc in docs_ref.stream():
-            doc_data = doc.to_dict()
-            doc_data['id'] = doc.id
-            documents.append(doc_data)
-        return jsonify(documents)
+        return jsonify(list(query_research_documents('projectId', project_id)))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1045,30 +1746,29 @@ def get_all_project_research_documents(project_id):
 def clear_source_documents(project_id):
     """Delete all source documents for a project."""
     try:
-        # Get all source documents
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
+        # Get all source documents; only the stored file path is needed
+        docs_ref = COLLECTION_REFS['assets'].where(
             'projectId', '==', project_id
         ).where(
             'isSourceDocument', '==', True
-        )
+        ).select(['gcsPath'])
 
-        deleted_count = 0
-        bucket = storage_client.bucket(STORAGE_BUCKET)
+        docs = list(docs_ref.stream())
+        bucket = get_bucket(STORAGE_BUCKET)
 
-        for doc in docs_ref.stream():
-            doc_data = doc.to_dict()
-            # Delete GCS file if exists
-            if doc_data.get('gcsPath'):
-                try:
-                    blob = bucket.blob(doc_data['gcsPath'])
-                    if blob.exists():
-                        blob.delete()
-                except Exception as e:
-                    print(f"Error deleting GCS file {doc_data['gcsPath']}: {e}")
+        # Delete GCS files in parallel; ones that are already gone are skipped
+        paths = [doc.to_dict().get('gcsPath') for doc in docs]
+        blobs = [bucket.blob(path) for path in paths if path]
+        try:
+            delete_blobs_concurrently(blobs)
+        except Exception as e:
+            print(f"Error deleting source files for {project_id}: {e}")
 
-            # Delete Firestore document
-            doc.reference.delete()
-            deleted_count += 1
+        # Delete Firestore documents in batched commits
+        write_in_batches(docs, lambda batch, doc: batch.delete(doc.reference))
+        for doc in docs:
+            forget_doc('assets', doc.id)
+        deleted_count = len(docs)
 
         return jsonify({"success": True, "deleted": deleted_count})
     except Exception as e:
@@ -1080,16 +1780,28 @@ def download_additional_sources(project_id):
     """Download source documents from a list of URLs."""
     data = request.get_json()
     urls = data.get('urls', [])
-    research_id = data.get('researchId', datetime.utcnow().strftime("%Y%m%d_%H%M%S"))
+    research_id = data.get('researchId', datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S"))
 
     if not urls:
         return jsonify({"error": "No URLs provided"}), 400
 
     ensure_bucket_exists(STORAGE_BUCKET)
+    urls = urls[:5]  # Max 5 per request
+    # Each download collects its own Firestore writes; they're batched here once all have finished
+    url_writes = [[] for _ in urls]
+    # Downloads are independent, so run them side by side; total time tracks the slowest URL
+    with ThreadPoolExecutor(max_workers=SOURCE_DOWNLOAD_WORKERS, thread_name_prefix="source") as pool:
+        futures = [
+            pool.submit(download_and_store, url, STORAGE_BUCKET, project_id, research_id, writes)
+            for url, writes in zip(urls, url_writes)
+        ]
     results = []
-    for url in urls[:5]:  # Max 5 per request
+    batch = db.batch()
+    for url, future, writes in zip(urls, futures, url_writes):
         try:
-            result = download_and_store(url, STORAGE_BUCKET, project_id, research_id)
+            result = future.result()
+            for ref, write_data in writes:
+                batch.set(ref, write_data)
             results.append({
                 "url": url,
                 "status": "completed" if result.get("status") == "success" else "error",
@@ -1100,84 +1812,132 @@ def download_additional_sources(project_id):
         except Exception as e:
             results.append({"url": url, "status": "error", "error": str(e)})
 
+    if any(r["status"] == "completed" for r in results):
+        try:
+            batch.commit()
+        except Exception as e:
+            print(f"[ERROR] Failed to save source document assets: {e}")
+            for r in results:
+                if r["status"] == "completed":
+                    r["status"] = "error"
+                    r["error"] = f"Downloaded, but saving the asset record failed: {e}"
     return jsonify({"results": results})
 
 
+def fetch_source_head(bucket, gcs_path):
+    """Look up a source blob and download up to DOWNLOAD_FETCH_SIZE bytes of it; (None, b'') if missing."""
+    blob = bucket.get_blob(gcs_path)
+    if blob is None:
+        return None, b''
+    if not blob.size:
+        return blob, b''
+    return blob, blob.download_as_bytes(start=0, end=DOWNLOAD_FETCH_SIZE - 1)
+
+
 @app.route("/api/projects/<project_id>/assets/download-all", methods=["GET"])
 def download_all_source_documents(project_id):
     """Download all source documents as a ZIP file."""
-    import zipfile
-    import io
-
     try:
-        # Get all source documents
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
+        # Get all source documents; only the file path and name are needed
+        docs_ref = COLLECTION_REFS['assets'].where(
             'projectId', '==', project_id
         ).where(
             'isSourceDocument', '==', True
-        )
+        ).select(['gcsPath', 'filename'])
 
-        # Create ZIP in memory
-        zip_buffer = io.BytesIO()
-        bucket = storage_client.bucket(STORAGE_BUCKET)
+        bucket = get_bucket(STORAGE_BUCKET)
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for doc in docs_ref.stream():
-                doc_data = doc.to_dict()
-                if doc_data.get('gcsPath'):
+        def generate():
+            """Generator that yields the ZIP while the next few source files download in parallel."""
+            sources = (doc.to_dict() for doc in docs_ref.stream())
+            sources = (doc_data for doc_data in sources if doc_data.get('gcsPath'))
+            pending = deque()
+
+            def prefetch_next():
+                doc_data = next(sources, None)
+                if doc_data:
+                    pending.append((doc_data, IO_EXECUTOR.submit(fetch_source_head, bucket, doc_data['gcsPath'])))
+
+            for _ in range(SOURCE_ZIP_PREFETCH):
+                prefetch_next()
+
+            sink = ZipStreamBuffer()
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                while pending:
+                    doc_data, future = pending.popleft()
+                    prefetch_next()
                     try:
-                        blob = bucket.blob(doc_data['gcsPath'])
-                        if blob.exists():
-                            content = blob.download_as_bytes()
-                            filename = doc_data.get('filename') or doc_data['gcsPath'].split('/')[-1]
-                            zip_file.writestr(filename, content)
+                        blob, head = future.result()
+                        if blob is None:
+                            continue
+                        filename = doc_data.get('filename') or doc_data['gcsPath'].split('/')[-1]
+                        info = zipfile.ZipInfo(filename, date_time=blob.updated.timetuple()[:6])
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        # Known up front so zipfile picks zip64 headers for very large files
+                        info.file_size = blob.size
+                        with zip_file.open(info, 'w') as entry:
+                            entry.write(head)
+                            yield sink.drain()
+                            # Only files larger than one fetch still have bytes left in GCS
+                            if len(head) < blob.size:
+                                with blob.open('rb', chunk_size=DOWNLOAD_FETCH_SIZE) as reader:
+                                    reader.seek(len(head))
+                                    for piece in iter(lambda: reader.read(DOWNLOAD_YIELD_SIZE), b''):
+                                        entry.write(piece)
+                                        yield sink.drain()
                     except Exception as e:
                         print(f"Error adding {doc_data['gcsPath']} to ZIP: {e}")
-
-        zip_buffer.seek(0)
+                    yield sink.drain()
+            # Closing the archive writes the central directory
+            yield sink.drain()
 
         return Response(
-            zip_buffer.getvalue(),
+            stream_with_context(generate()),
             mimetype='application/zip',
             headers={'Content-Disposition': f'attachment; filename="source-documents-{project_id[:8]}.zip"'}
         )
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-
-# ============== Script Routes ==============
-
-@app.route("/api/projects/<project_id>/scripts", methods=["GET"])
-def get_scripts(project_id):
-    """Get all scripts for a project."""
-    scripts = get_all_docs('scripts', project_id)
-    return jsonify(scripts)
-
+        return jsonify({"error": str(e)}), 500
 
-@app.route("/api/scripts", methods=["POST"])
-def create_script():
-    """Create a new script."""
-    data = request.get_json()
-    script = create_doc('scripts', data)
-    return jsonify(script), 201
 
+# ============== Feedback Routes ==============
 
-@app.route("/api/scripts/<script_id>", methods=["PUT"])
-def update_script(script_id):
-    """Update a script."""
-    data = request.get_json()
-    script = update_doc('scripts', script_id, data)
-    return jsonify(script)
+def save_feedback_screenshot(doc_ref, screenshot_path, screenshot_data):
+    """Decode a data-URL screenshot, store it as WebP, and clear screenshotPath on the feedback doc if that fails.
 
+    If re-encoding fails the original image is stored under a name matching its own type,
+    and screenshotPath is updated to that name.
+    """
+    stored_path = screenshot_path
+    try:
+        header, base64_data = screenshot_data.split(',', 1)
+        image_data = base64.b64decode(base64_data)
+        content_type = header[len('data:'):].split(';', 1)[0] or 'image/jpeg'
 
-@app.route("/api/scripts/<script_id>", methods=["DELETE"])
-def delete_script(script_id):
-    """Delete a script."""
-    delete_doc('scripts', script_id)
-    return jsonify({"success": True})
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            webp_buffer = io.BytesIO()
+            image.save(webp_buffer, 'WEBP', quality=SCREENSHOT_WEBP_QUALITY, method=4)
+            image_data = webp_buffer.getvalue()
+            content_type = 'image/webp'
+        except Exception as e:
+            # Keep the original encoding rather than lose the screenshot, named for what it is
+            stored_path = f"{screenshot_path.rsplit('.', 1)[0]}{mimetypes.guess_extension(content_type) or ''}"
+            print(f"Screenshot re-encode failed, storing as {content_type}: {e}")
 
+        ensure_bucket_exists(STORAGE_BUCKET)
+        blob = get_bucket(STORAGE_BUCKET).blob(stored_path)
+        blob.upload_from_string(image_data, content_type=content_type)
+        if stored_path != screenshot_path:
+            doc_ref.update({'screenshotPath': stored_path})
+        print(f"Feedback screenshot saved: {stored_path}")
+    except Exception as e:
+        print(f"Error saving feedback screenshot: {e}")
+        try:
+            doc_ref.update({'screenshotPath': None})
+        except Exception as e:
+            print(f"Error clearing screenshot path on {doc_ref.id}: {e}")
 
-# ============== Feedback Routes ==============
 
 @app.route("/api/feedback", methods=["POST"])
 def submit_feedback():
@@ -1192,35 +1952,16 @@ def submit_feedback():
     current_tab = data.get('currentTab')
     user_agent = data.get('userAgent', '')
     screen_size = data.get('screenSize', '')
-    timestamp = data.get('timestamp', datetime.utcnow().isoformat())
+    timestamp = data.get('timestamp', now_iso())
 
     if not feedback_text:
         return jsonify({"error": "Feedback text is required"}), 400
 
-    # Save screenshot to GCS if provided
+    # Screenshot is decoded and uploaded in the background; its path is fixed up front
     screenshot_path = None
     if screenshot_data and screenshot_data.startswith('data:image'):
-        try:
-            # Extract base64 data
-            header, base64_data = screenshot_data.split(',', 1)
-            image_data = base64.b64decode(base64_data)
-
-            # Generate unique filename
-            feedback_id = str(uuid.uuid4())[:8]
-            screenshot_filename = f"feedback/{feedback_id}_screenshot.jpg"
-
-            # Upload to GCS
-            ensure_bucket_exists(STORAGE_BUCKET)
-            bucket = storage_client.bucket(STORAGE_BUCKET)
-            blob = bucket.blob(screenshot_filename)
-            blob.upload_from_string(image_data, content_type='image/jpeg')
-
-            screenshot_path = screenshot_filename
-            print(f"Feedback screenshot saved: {screenshot_filename}")
-
-        except Exception as e:
-            print(f"Error saving feedback screenshot: {e}")
-            # Continue without screenshot
+        feedback_id = str(uuid.uuid4())[:8]
+        screenshot_path = f"feedback/{feedback_id}_screenshot.webp"
 
     # Create feedback document
     feedback_doc = {
@@ -1242,10 +1983,13 @@ def submit_feedback():
     }
 
     # Save to Firestore
-    doc_ref = db.collection(COLLECTIONS['feedback']).document()
+    doc_ref = COLLECTION_REFS['feedback'].document()
     doc_ref.set(feedback_doc)
     feedback_doc['id'] = doc_ref.id
 
+    if screenshot_path:
+        IO_EXECUTOR.submit(save_feedback_screenshot, doc_ref, screenshot_path, screenshot_data)
+
     print(f"Feedback submitted: [{feedback_type}] {feedback_text[:50]}...")
 
     return jsonify({
@@ -1259,7 +2003,7 @@ def submit_feedback():
 @app.route("/api/feedback", methods=["GET"])
 def get_all_feedback():
     """Get all feedback (admin view)."""
-    docs = db.collection(COLLECTIONS['feedback']).order_by(
+    docs = COLLECTION_REFS['feedback'].order_by(
         'createdAt', direction=firestore.Query.DESCENDING
     ).limit(100).stream()
 
@@ -1278,14 +2022,14 @@ def update_feedback_status(feedback_id):
     try:
         data = request.get_json()
         update_data = {
-            "updatedAt": datetime.utcnow().isoformat()
+            "updatedAt": now_iso()
         }
         if 'status' in data:
             update_data['status'] = data['status']
         if 'response' in data:
             update_data['response'] = data['response']
 
-        doc_ref = db.collection(COLLECTIONS['feedback']).document(feedback_id)
+        doc_ref = COLLECTION_REFS['feedback'].document(feedback_id)
         doc_ref.update(update_data)
         return jsonify({"success": True})
     except Exception as e:
@@ -1308,7 +2052,7 @@ def get_blueprint_content(project_id):
         try:
             file_path = project['blueprintFile'].get('path', '')
             if file_path:
-                bucket = storage_client.bucket(STORAGE_BUCKET)
+                bucket = get_bucket(STORAGE_BUCKET)
                 blob = bucket.blob(file_path)
                 if blob.exists():
                     content = blob.download_as_text()
@@ -1339,81 +2083,22 @@ def ai_generate_script():
     # Get research for this episode if available
     research_content = ""
     if episode_id:
-        research_docs = db.collection(COLLECTIONS['research']).where(
+        research_docs = COLLECTION_REFS['research'].where(
             'episodeId', '==', episode_id
-        ).limit(1).stream()
+        ).select(['content']).limit(1).stream()
         for doc in research_docs:
             research_content = doc.to_dict().get('content', '')[:5000]
             break
 
-    system_prompt = f"""You are a professional documentary script writer creating scripts optimized for AI-assisted editing tools like Quickture.
+    research_section = f"\n\nRESEARCH AVAILABLE:\n{research_content}" if research_content else ""
 
-## PROJECT CONTEXT
+    # Project details go in the per-request prompt so the system instruction stays constant
+    prompt = f"""## PROJECT CONTEXT
 - Project: {project_title}
 - Style: {project_style or 'Documentary'}
 - Description: {project_description}
 
-## QUICKTURE-COMPATIBLE SCRIPT FORMAT
-
-Create a detailed documentary script that includes:
-
-1. **HEADER SECTION**
-   - Episode title and number
-   - Target duration
-   - Style/tone notes for editors
-
-2. **SCENE BREAKDOWN** (use this format for each scene):
-   ```
-   SCENE [NUMBER]: [SCENE TITLE]
-   Duration: [estimated time]
-   Location: [setting]
-   Mood: [emotional tone]
-
-   VISUAL:
-   [Description of what we see - B-roll, interviews, graphics]
-
-   AUDIO:
-   [Narration, interview soundbites, ambient sound, music cues]
-
-   NARRATION:
-   "[Exact narration text if any]"
-
-   INTERVIEW BITES:
-   - [Subject name]: "[Key quote or topic to cover]"
-
-   B-ROLL NEEDED:
-   - [List of specific shots needed]
-
-   GRAPHICS/TEXT:
-   - [Any lower thirds, titles, or info graphics]
-
-   TRANSITION:
-   [How this scene connects to the next]
-   ```
-
-3. **SHOT LIST SUMMARY**
-   - Numbered list of all shots with descriptions
-   - Technical notes (wide/close, handheld/tripod, etc.)
-
-4. **INTERVIEW GUIDE**
-   - Questions for each subject
-   - Key points to cover
-
-5. **MUSIC/SOUND DESIGN NOTES**
-   - Mood suggestions per scene
-   - Transition audio cues
-
-## REQUIREMENTS
-- Be specific and actionable for editors
-- Include timing estimates for pacing
-- Mark emotional beats and story arc moments
-- Note any archival footage or graphics needed
-- Keep narration concise and documentary-style
-"""
-
-    research_section = f"\n\nRESEARCH AVAILABLE:\n{research_content}" if research_content else ""
-
-    prompt = f"""Create a detailed, Quickture-compatible documentary script for:
+Create a detailed, Quickture-compatible documentary script for:
 
 Episode: {episode_title}
 Description: {episode_description}
@@ -1422,7 +2107,7 @@ Target Duration: {duration}
 
 Generate a comprehensive production script with scene breakdowns, shot lists, narration, and interview guides."""
 
-    result = generate_ai_response(prompt, system_prompt)
+    result = generate_ai_response(prompt, QUICKTURE_SCRIPT_SYSTEM_PROMPT)
 
     # Save the script
     script_data = {
@@ -1458,70 +2143,123 @@ def ai_research():
     })
 
 
+# Research documents contribute at most this many characters of AI context; a UTF-8
+# character is at most 4 bytes, so no more than RESEARCH_DOC_MAX_BYTES are downloaded
+RESEARCH_DOC_MAX_CHARS = 10000
+RESEARCH_DOC_MAX_BYTES = 4 * RESEARCH_DOC_MAX_CHARS
+
+# Total characters of research document text allowed into one prompt
+RESEARCH_CONTEXT_BUDGET_CHARS = 40000
+
+# Truncated research document text by GCS path; uploads always get a fresh object name,
+# so a path's content never changes and the TTL only bounds how long deleted files linger
+RESEARCH_DOC_CACHE = TTLCache(maxsize=512, ttl=600)
+RESEARCH_DOC_CACHE_LOCK = threading.Lock()
+
+# Fields read from research-document assets when building AI context
+RESEARCH_DOCUMENT_FIELDS = ['gcsPath', 'mimeType', 'title', 'filename', 'projectId', 'episodeId', 'seriesId']
+
+
 def get_research_document_contents(episode_id=None, series_id=None, project_id=None):
     """Fetch and read contents of research documents for context."""
     documents_context = []
+    scopes = [
+        (label, field, value)
+        for label, field, value in [
+            ('Episode', 'episodeId', episode_id),
+            ('Series', 'seriesId', series_id),
+            ('Project', 'projectId', project_id),
+        ]
+        if value
+    ]
+
+    if not scopes:
+        return documents_context
 
     try:
-        # Get episode research documents
-        if episode_id:
-            docs = db.collection(COLLECTIONS['assets']).where('episodeId', '==', episode_id).where('isResearchDocument', '==', True).stream()
-            for doc in docs:
-                data = doc.to_dict()
-                content = read_document_content(data.get('gcsPath'), data.get('mimeType', ''))
-                if content:
-                    documents_context.append({
-                        'source': f"Episode Document: {data.get('title', data.get('filename', 'Unknown'))}",
-                        'content': content
-                    })
-
-        # Get series research documents
-        if series_id:
-            docs = db.collection(COLLECTIONS['assets']).where('seriesId', '==', series_id).where('isResearchDocument', '==', True).stream()
-            for doc in docs:
-                data = doc.to_dict()
-                content = read_document_content(data.get('gcsPath'), data.get('mimeType', ''))
-                if content:
-                    documents_context.append({
-                        'source': f"Series Document: {data.get('title', data.get('filename', 'Unknown'))}",
-                        'content': content
-                    })
-
-        # Get project-level research documents
-        if project_id:
-            docs = db.collection(COLLECTIONS['assets']).where('projectId', '==', project_id).where('isResearchDocument', '==', True).stream()
-            for doc in docs:
-                data = doc.to_dict()
+        # One OR query covers every scope; results are sorted by document ID so the
+        # same documents always produce the same context text
+        scope_filters = [FieldFilter(field, '==', value) for label, field, value in scopes]
+        docs_ref = COLLECTION_REFS['assets'].where(
+            filter=Or(scope_filters) if len(scope_filters) > 1 else scope_filters[0]
+        ).where(
+            filter=FieldFilter('isResearchDocument', '==', True)
+        ).select(RESEARCH_DOCUMENT_FIELDS)
+        docs = [doc.to_dict() for doc in sorted(docs_ref.stream(), key=lambda doc: doc.id)]
+
+        # Partition back into episode, series, project order
+        found = []
+        for label, field, value in scopes:
+            for data in docs:
+                if data.get(field) != value:
+                    continue
                 # Only include project-level docs (not linked to episode/series)
-                if not data.get('episodeId') and not data.get('seriesId'):
-                    content = read_document_content(data.get('gcsPath'), data.get('mimeType', ''))
-                    if content:
-                        documents_context.append({
-                            'source': f"Project Document: {data.get('title', data.get('filename', 'Unknown'))}",
-                            'content': content
-                        })
+                if field == 'projectId' and (data.get('episodeId') or data.get('seriesId')):
+                    continue
+                found.append((label, data))
+
+        # Then read every document's content concurrently, keeping episode, series, project order
+        contents = IO_EXECUTOR.map(
+            lambda item: read_document_content(item[1].get('gcsPath'), item[1].get('mimeType', '')),
+            found
+        )
+        for (label, data), content in zip(found, contents):
+            if content:
+                documents_context.append({
+                    'source': f"{label} Document: {data.get('title', data.get('filename', 'Unknown'))}",
+                    'content': content
+                })
     except Exception as e:
         print(f"[ERROR] Error fetching research documents: {e}")
 
     return documents_context
 
 
+def fit_research_context(research_docs, budget=RESEARCH_CONTEXT_BUDGET_CHARS):
+    """Trim research documents to a total character budget, keeping as many whole documents as possible.
+
+    Shorter documents are fitted first. Cuts never depend on the query, so the reference block
+    stays identical across questions and keeps the cached prompt prefix.
+    Documents keep their original order; ones that no longer fit are cut short or reduced to a note.
+    """
+    ranked = sorted(range(len(research_docs)), key=lambda i: (len(research_docs[i]['content']), i))
+    allowed = {}
+    remaining = budget
+    for i in ranked:
+        allowed[i] = min(len(research_docs[i]['content']), remaining)
+        remaining -= allowed[i]
+
+    fitted = []
+    for i, doc in enumerate(research_docs):
+        content = doc['content']
+        if allowed[i] == 0:
+            content = "[Omitted to keep the prompt within its context budget]"
+        elif allowed[i] < len(content):
+            content = content[:allowed[i]] + "\n[Truncated to keep the prompt within its context budget]"
+        fitted.append({'source': doc['source'], 'content': content})
+    return fitted
+
+
 def read_document_content(gcs_path, mime_type=''):
     """Read content from a document in GCS."""
     if not gcs_path:
         return None
 
     try:
-        bucket = storage_client.bucket(STORAGE_BUCKET)
-        blob = bucket.blob(gcs_path)
-        content = blob.download_as_bytes()
-
-        # For text-based files, decode to string
+        # For text-based files, fetch only the bytes that can fall within the character limit
         if mime_type.startswith('text/') or gcs_path.endswith(('.txt', '.md', '.csv')):
-            return content.decode('utf-8', errors='ignore')[:10000]  # Limit to 10k chars
+            with RESEARCH_DOC_CACHE_LOCK:
+                text = RESEARCH_DOC_CACHE.get(gcs_path)
+            if text is None:
+                bucket = get_bucket(STORAGE_BUCKET)
+                content = bucket.blob(gcs_path).download_as_bytes(start=0, end=RESEARCH_DOC_MAX_BYTES - 1)
+                text = content.decode('utf-8', errors='ignore')[:RESEARCH_DOC_MAX_CHARS]
+                with RESEARCH_DOC_CACHE_LOCK:
+                    RESEARCH_DOC_CACHE[gcs_path] = text
+            return text
 
         # For PDFs and other binary formats, we'd need extraction
-        # For now, skip binary files
+        # For now, skip binary files without downloading them
         if gcs_path.endswith('.pdf'):
             return f"[PDF Document - content extraction not implemented]"
 
@@ -1531,6 +2269,23 @@ def read_document_content(gcs_path, mime_type=''):
         return None
 
 
+def store_episode_research(episode_id, research):
+    """Write generated research onto an episode; returns the error message on failure, else None."""
+    try:
+        now = now_iso()
+        COLLECTION_REFS['episodes'].document(episode_id).update({
+            'research': research,
+            'researchGeneratedAt': now,
+            'updatedAt': now
+        })
+        forget_doc('episodes', episode_id)
+        print(f"[DEBUG] Research saved successfully to episode {episode_id}")
+        return None
+    except Exception as e:
+        print(f"[ERROR] Failed to save research: {e}")
+        return str(e)
+
+
 @app.route("/api/ai/simple-research", methods=["POST"])
 def ai_simple_research():
     """AI research query augmented with uploaded research documents from episode and series."""
@@ -1554,21 +2309,24 @@ def ai_simple_research():
 
     print(f"[DEBUG] Found {len(research_docs)} research documents for context")
 
-    # Build context from research documents
+    # Build context from research documents within budget
     context_section = ""
     if research_docs:
-        context_section = "\n\n## Reference Documents\n\nThe following research documents have been uploaded and should be used as context:\n\n"
-        for doc in research_docs:
-            context_section += f"### {doc['source']}\n{doc['content']}\n\n"
+        research_docs = fit_research_context(research_docs)
+        context_section = "## Reference Documents\n\nThe following research documents have been uploaded and should be used as context:\n\n" + "".join(
+            f"### {doc['source']}\n{doc['content']}\n\n" for doc in research_docs
+        )
 
     # Use user's query if provided, otherwise fall back to title/description
     research_query = user_query if user_query else f"Research background information for the documentary episode titled '{title}': {description}"
 
-    prompt = f"""You are researching for a documentary episode.
+    # Reference documents lead so the prompt prefix stays the same across queries on one episode
+    prompt = f"""{context_section}
+
+You are researching for a documentary episode.
 
 Episode: {title}
 {f'Description: {description}' if description else ''}
-{context_section}
 
 ## Research Request
 
@@ -1576,7 +2334,7 @@ Episode: {title}
 
 ## Instructions
 
-Based on {'the reference documents above and ' if research_docs else ''}the research request, provide:
+Based on {'the reference documents at the start and ' if research_docs else ''}the research request, provide:
 - Key facts and background information
 - Relevant sources and references (with URLs where possible)
 - Interview suggestions (people to talk to)
@@ -1590,9 +2348,7 @@ Format your response with:
 - Include real, clickable URLs to credible sources (news sites, Wikipedia, .gov, .edu, .org sites)
 - Mark each source with its URL in markdown link format: [Source Name](URL)"""
 
-    system_prompt = """You are a documentary research assistant. Provide comprehensive background research with real source links. Always format URLs as markdown links that can be clicked. Focus on factual, verifiable information from credible sources. When reference documents are provided, incorporate their information and expand upon it."""
-
-    result = generate_ai_response(prompt, system_prompt)
+    result = generate_ai_response(prompt, RESEARCH_SYSTEM_PROMPT)
 
     print(f"[DEBUG] AI response length: {len(result)} chars")
 
@@ -1604,23 +2360,16 @@ Format your response with:
         "documentsUsed": len(research_docs)
     }
 
-    # Save research to episode if episodeId provided
+    # Save research to episode if episodeId provided. A single document update, so it's awaited
+    # and the response says whether it landed rather than leaving a failure only in the logs
     if save_research and episode_id and project_id:
-        try:
-            print(f"[DEBUG] Saving research to episode {episode_id}")
-            # Update the episode with the research content
-            episode_ref = db.collection(COLLECTIONS['episodes']).document(episode_id)
-            episode_ref.update({
-                'research': result,
-                'researchGeneratedAt': datetime.utcnow().isoformat(),
-                'updatedAt': datetime.utcnow().isoformat()
-            })
+        print(f"[DEBUG] Saving research to episode {episode_id}")
+        save_error = store_episode_research(episode_id, result)
+        if save_error:
+            response_data['saveError'] = save_error
+        else:
             response_data['saved'] = True
             response_data['episodeId'] = episode_id
-            print(f"[DEBUG] Research saved successfully to episode {episode_id}")
-        except Exception as e:
-            print(f"[ERROR] Failed to save research: {e}")
-            response_data['saveError'] = str(e)
 
     return jsonify(response_data)
 
@@ -1656,12 +2405,13 @@ def delete_episode_research(episode_id):
     """Delete saved research for an episode."""
     print(f"[DEBUG] Deleting research for episode {episode_id}")
     try:
-        episode_ref = db.collection(COLLECTIONS['episodes']).document(episode_id)
+        episode_ref = COLLECTION_REFS['episodes'].document(episode_id)
         episode_ref.update({
             'research': '',
             'researchGeneratedAt': '',
-            'updatedAt': datetime.utcnow().isoformat()
+            'updatedAt': now_iso()
         })
+        forget_doc('episodes', episode_id)
         print(f"[DEBUG] Research deleted for episode {episode_id}")
         return jsonify({"success": True})
     except Exception as e:
@@ -1681,7 +2431,7 @@ def save_episode_research(episode_id):
             return jsonify({"error": "No research content provided"}), 400
 
         # Get episode to find projectId
-        episode_ref = db.collection(COLLECTIONS['episodes']).document(episode_id)
+        episode_ref = COLLECTION_REFS['episodes'].document(episode_id)
         episode_doc = episode_ref.get()
         if not episode_doc.exists:
             return jsonify({"error": "Episode not found"}), 404
@@ -1691,37 +2441,45 @@ def save_episode_research(episode_id):
         episode_title = episode_data.get('title', 'Unknown Episode')
 
         # Save research to episode
+        now = now_iso()
         episode_ref.update({
             'research': research,
-            'researchGeneratedAt': datetime.utcnow().isoformat(),
-            'updatedAt': datetime.utcnow().isoformat()
+            'researchGeneratedAt': now,
+            'updatedAt': now
         })
+        forget_doc('episodes', episode_id)
         print(f"[DEBUG] Research saved for episode {episode_id}, length: {len(research)}")
 
         # Extract markdown links and create assets as reference links
         links_created = 0
-        markdown_links = []
+        links_found = 0
 
         if project_id:
-            # Find all markdown links: [text](url)
-            markdown_links = re.findall(r'\[([^\]]+)\]\((https?://[^)]+)\)', research)
-            print(f"[DEBUG] Found {len(markdown_links)} links in research")
-
-            for link_text, link_url in markdown_links:
-                try:
-                    # Check if asset with this URL already exists for this project
-                    existing = db.collection(COLLECTIONS['assets']).where(
+            # Find all markdown links: [text](url); first link text wins when a URL is cited more than once
+            link_titles = {}
+            for match in MARKDOWN_LINK_RE.finditer(research):
+                link_titles.setdefault(match.group(2), match.group(1))
+                links_found += 1
+            print(f"[DEBUG] Found {links_found} links in research")
+
+            try:
+                # Look up which URLs already have assets, FIRESTORE_IN_LIMIT per query, queries in parallel
+                urls = list(link_titles)
+                url_groups = [urls[i:i + FIRESTORE_IN_LIMIT] for i in range(0, len(urls), FIRESTORE_IN_LIMIT)]
+                existing_urls = set()
+                for docs in IO_EXECUTOR.map(
+                    lambda group: COLLECTION_REFS['assets'].where(
                         'projectId', '==', project_id
                     ).where(
-                        'source', '==', link_url
-                    ).limit(1).get()
-
-                    if len(list(existing)) > 0:
-                        print(f"[DEBUG] Asset already exists for URL: {link_url[:50]}...")
-                        continue
-
-                    # Create asset for this link as a reference (link only, no download)
-                    asset_data = {
+                        'source', 'in', group
+                    ).select(['source']).get(),
+                    url_groups
+                ):
+                    existing_urls.update(doc.to_dict().get('source') for doc in docs)
+
+                # Create assets for new links as references (link only, no download)
+                new_links = [
+                    {
                         "projectId": project_id,
                         "episodeId": episode_id,
                         "title": link_text[:100],
@@ -1732,21 +2490,23 @@ def save_episode_research(episode_id):
                         "isResearchLink": True,
                         "sourceEpisode": episode_title,
                         "notes": f"Extracted from research for: {episode_title}",
-                        "createdAt": datetime.utcnow().isoformat(),
-                        "updatedAt": datetime.utcnow().isoformat()
+                        "createdAt": now,
+                        "updatedAt": now
                     }
-                    doc_ref = db.collection(COLLECTIONS['assets']).document()
-                    doc_ref.set(asset_data)
-                    links_created += 1
-                    print(f"[DEBUG] Created asset: {link_text[:50]}...")
-                except Exception as link_error:
-                    print(f"[ERROR] Failed to create asset for {link_url}: {link_error}")
+                    for link_url, link_text in link_titles.items()
+                    if link_url not in existing_urls
+                ]
+                write_in_batches(new_links, lambda batch, asset_data: batch.set(COLLECTION_REFS['assets'].document(), asset_data))
+                links_created = len(new_links)
+                print(f"[DEBUG] {len(existing_urls)} links already had assets")
+            except Exception as link_error:
+                print(f"[ERROR] Failed to create assets for research links: {link_error}")
 
         print(f"[DEBUG] Created {links_created} new reference assets")
         return jsonify({
             "success": True,
             "episodeId": episode_id,
-            "linksExtracted": len(markdown_links),
+            "linksExtracted": links_found,
             "assetsCreated": links_created
         })
     except Exception as e:
@@ -1763,14 +2523,11 @@ def ai_interview_questions():
     context = data.get('context', '')
     project_title = data.get('projectTitle', '')
 
-    system_prompt = """You are a documentary interview specialist. Generate thoughtful, open-ended questions that elicit detailed stories and insights. Focus on emotional moments, specific details, and unique perspectives."""
-
     prompt = f"""Generate 8-10 interview questions for {subject}, who is/was a {role}, for a documentary about "{project_title}".
 Focus on: {context}.
 Make questions specific, open-ended, and designed to get compelling stories."""
 
-    result = generate_ai_response(prompt, system_prompt)
-    return jsonify({"result": result})
+    return ai_result_response(prompt, INTERVIEW_SYSTEM_PROMPT, stream=data.get('stream', False))
 
 
 @app.route("/api/ai/script-outline", methods=["POST"])
@@ -1782,14 +2539,11 @@ def ai_script_outline():
     duration = data.get('duration', '45 minutes')
     project_title = data.get('projectTitle', '')
 
-    system_prompt = """You are a documentary scriptwriter. Create detailed episode outlines with clear acts, narrative arcs, and visual storytelling elements."""
-
     prompt = f"""Create a detailed outline for a documentary episode titled "{title}" ({duration}) about: {topic}.
 This is for the documentary "{project_title}".
 Include acts, key beats, narrative arc, and suggested visuals."""
 
-    result = generate_ai_response(prompt, system_prompt)
-    return jsonify({"result": result})
+    return ai_result_response(prompt, SCRIPT_OUTLINE_SYSTEM_PROMPT, stream=data.get('stream', False))
 
 
 @app.route("/api/ai/shot-ideas", methods=["POST"])
@@ -1799,14 +2553,11 @@ def ai_shot_ideas():
     scene = data.get('scene', '')
     project_title = data.get('projectTitle', '')
 
-    system_prompt = """You are a documentary cinematographer. Suggest creative, visually compelling shot ideas with specific camera movements, angles, and equipment."""
-
     prompt = f"""Suggest 5-7 creative shots for: {scene}.
 This is for "{project_title}".
 Include camera angles, movements, equipment needed, and why each shot would be compelling."""
 
-    result = generate_ai_response(prompt, system_prompt)
-    return jsonify({"result": result})
+    return ai_result_response(prompt, SHOT_IDEAS_SYSTEM_PROMPT, stream=data.get('stream', False))
 
 
 @app.route("/api/ai/expand-topic", methods=["POST"])
@@ -1816,13 +2567,10 @@ def ai_expand_topic():
     topic = data.get('topic', '')
     project_title = data.get('projectTitle', '')
 
-    system_prompt = """You are a documentary story consultant. Help explore topics by suggesting angles, themes, narrative approaches, and key elements to investigate."""
-
     prompt = f"""Explore potential angles and approaches for covering "{topic}" in the documentary "{project_title}".
 Suggest themes, storylines, key questions to answer, and unique perspectives."""
 
-    result = generate_ai_response(prompt, system_prompt)
-    return jsonify({"result": result})
+    return ai_result_response(prompt, EXPAND_TOPIC_SYSTEM_PROMPT, stream=data.get('stream', False))
 
 
 @app.route("/api/ai/episode-research", methods=["POST"])
@@ -1845,21 +2593,6 @@ def ai_generate_topics():
     style = data.get('style', '')
     num_topics = data.get('numTopics', 5)
 
-    system_prompt = """You are a documentary series planner. Generate compelling episode topics that would make a cohesive documentary series.
-
-IMPORTANT: Respond ONLY with a JSON array of episode objects. No markdown, no explanation, just valid JSON.
-
-Each episode object must have:
-- "title": A compelling episode title (max 60 chars)
-- "description": Brief description of what this episode covers (max 150 chars)
-- "order": Episode number (1, 2, 3, etc.)
-
-Example response format:
-[
-  {"title": "Episode Title Here", "description": "What this episode covers", "order": 1},
-  {"title": "Another Episode", "description": "Description of content", "order": 2}
-]"""
-
     style_instruction = f"\nStyle/Approach: {style}\nEnsure all episodes match this documentary style." if style else ""
 
     prompt = f"""Create {num_topics} episode topics for a documentary series:
@@ -1875,7 +2608,7 @@ Generate episode topics that:
 
 Return ONLY the JSON array, no other text."""
 
-    result = generate_ai_response(prompt, system_prompt)
+    result = generate_ai_response(prompt, GENERATE_TOPICS_SYSTEM_PROMPT)
 
     # Parse the JSON response
     try:
@@ -1886,8 +2619,7 @@ Return ONLY the JSON array, no other text."""
             lines = cleaned.split('\n')
             cleaned = '\n'.join(lines[1:-1] if lines[-1].startswith('```') else lines[1:])
 
-        import json
-        topics = json.loads(cleaned)
+        topics = orjson.loads(cleaned)
         return jsonify({"topics": topics})
     except Exception as e:
         # If parsing fails, return the raw result for debugging
@@ -1904,7 +2636,7 @@ def init_chunked_upload():
     total_chunks = data.get('totalChunks', 1)
 
     # Generate unique upload ID and blob name
-    upload_id = hashlib.md5(f"{filename}{datetime.utcnow().isoformat()}".encode()).hexdigest()[:16]
+    upload_id = hashlib.md5(f"{filename}{now_iso()}".encode()).hexdigest()[:16]
     ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
     blob_name = f"uploads/{upload_id}.{ext}"
 
@@ -1912,6 +2644,7 @@ def init_chunked_upload():
         "uploadId": upload_id,
         "gcsUri": f"gs://{STORAGE_BUCKET}/{blob_name}",
         "blobPath": blob_name,
+        "sessionUri": create_upload_session(blob_name, content_type, file_size),
         "totalChunks": total_chunks
     })
 
@@ -1928,16 +2661,19 @@ def upload_chunk(upload_id):
         return jsonify({"error": "No chunk data"}), 400
 
     chunk = request.files['chunk']
-    chunk_data = chunk.read()
+    # Werkzeug has already spooled the part; measure it rather than copying it into bytes
+    chunk.stream.seek(0, os.SEEK_END)
+    chunk_size = chunk.stream.tell()
+    chunk.stream.seek(0)
 
     try:
         ensure_bucket_exists(STORAGE_BUCKET)
-        bucket = storage_client.bucket(STORAGE_BUCKET)
+        bucket = get_bucket(STORAGE_BUCKET)
 
         # Store chunk temporarily
         chunk_blob_name = f"uploads/chunks/{upload_id}/chunk_{chunk_index:04d}"
         chunk_blob = bucket.blob(chunk_blob_name)
-        chunk_blob.upload_from_string(chunk_data, content_type='application/octet-stream')
+        chunk_blob.upload_from_file(chunk.stream, size=chunk_size, content_type='application/octet-stream')
 
         # If this is the last chunk, combine all chunks
         if chunk_index == total_chunks - 1:
@@ -1945,23 +2681,12 @@ def upload_chunk(upload_id):
             chunk_blobs = list(bucket.list_blobs(prefix=f"uploads/chunks/{upload_id}/"))
             chunk_blobs.sort(key=lambda b: b.name)
 
-            # Combine chunks into final file
-            final_blob = bucket.blob(blob_path)
+            # Combine chunks into final file server-side, in stages past 32 chunks
+            compose_blobs(bucket, chunk_blobs, blob_path, content_type,
+                          scratch_prefix=f"uploads/compose/{upload_id}/")
 
-            # Use compose for efficiency (works for up to 32 components)
-            if len(chunk_blobs) <= 32:
-                final_blob.compose(chunk_blobs)
-            else:
-                # For more than 32 chunks, we need to compose in stages
-                # First, combine all chunk data
-                combined_data = b''
-                for cb in chunk_blobs:
-                    combined_data += cb.download_as_bytes()
-                final_blob.upload_from_string(combined_data, content_type=content_type)
-
-            # Clean up chunks
-            for cb in chunk_blobs:
-                cb.delete()
+            # Clean up chunks after responding; the final object no longer needs them
+            delete_blobs_concurrently(chunk_blobs, wait=False)
 
             return jsonify({
                 "status": "complete",
@@ -1980,6 +2705,62 @@ def upload_chunk(upload_id):
         return jsonify({"error": f"Chunk upload failed: {str(e)}"}), 500
 
 
+def blueprint_render_ref(doc_blob_name):
+    """Firestore doc in the blueprint_renders collection recording how a blueprint PDF's render ended."""
+    return COLLECTION_REFS['blueprint_renders'].document(doc_blob_name.rsplit('/', 1)[-1])
+
+
+def record_blueprint_status(doc_blob_name, status):
+    """Record a blueprint PDF's render outcome and copy it onto every project that references the PDF."""
+    now = now_iso()
+    blueprint_render_ref(doc_blob_name).set({'path': doc_blob_name, 'status': status, 'updatedAt': now})
+    projects = list(
+        COLLECTION_REFS['projects'].where('blueprintFile.path', '==', doc_blob_name).select([]).stream()
+    )
+    write_in_batches(projects, lambda batch, doc: batch.update(
+        doc.reference, {'blueprintFile.status': status, 'updatedAt': now}
+    ))
+    for doc in projects:
+        forget_doc('projects', doc.id)
+
+
+def store_blueprint_pdf(doc_blob_name, title, blueprint_doc_content):
+    """Render blueprint markdown to a PDF and upload it, recording ready or failed on the referencing projects."""
+    status = 'failed'
+    try:
+        # Convert markdown to HTML
+        html_content = markdown.markdown(blueprint_doc_content, extensions=['tables', 'fenced_code'])
+
+        # Create styled HTML document
+        styled_html = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body>
+    <div class="header">
+        <h1>{title}</h1>
+        <p>Project Blueprint Document</p>
+    </div>
+    {html_content}
+</body>
+</html>"""
+
+        # Convert HTML to PDF using WeasyPrint
+        pdf_content = render_pdf_in_pool(styled_html, css=BLUEPRINT_PDF_CSS)
+
+        get_bucket(STORAGE_BUCKET).blob(doc_blob_name).upload_from_string(pdf_content, content_type='application/pdf')
+        status = 'ready'
+        print(f"[DEBUG] Blueprint PDF saved to {doc_blob_name} ({len(pdf_content)} bytes)")
+    except Exception as e:
+        print(f"[ERROR] Failed to save blueprint PDF {doc_blob_name}: {e}")
+
+    try:
+        record_blueprint_status(doc_blob_name, status)
+    except Exception as e:
+        print(f"[ERROR] Failed to record blueprint PDF status for {doc_blob_name}: {e}")
+
+
 @app.route("/api/ai/analyze-blueprint", methods=["POST"])
 def ai_analyze_blueprint():
     """Analyze an uploaded document or video to extract project blueprint.
@@ -1988,11 +2769,6 @@ def ai_analyze_blueprint():
     1. Direct file upload (for small files < 32MB)
     2. GCS URI (for large files uploaded via signed URL)
     """
-    import json
-    import tempfile
-    import mimetypes
-    from vertexai.generative_models import Part
-
     # Check for GCS URI (for large files uploaded directly to GCS)
     gcs_uri = None
     if request.is_json:
@@ -2025,45 +2801,7 @@ def ai_analyze_blueprint():
     else:
         return jsonify({"error": "No file uploaded and no gcsUri provided"}), 400
 
-    system_prompt = """You are a documentary production analyst. Analyze the provided content and create a comprehensive project blueprint document.
-
-IMPORTANT: Respond ONLY with a JSON object. No markdown, no explanation, just valid JSON.
-
-The JSON must have:
-- "title": A compelling project title (max 80 chars)
-- "description": A comprehensive description of what this documentary should cover (max 500 chars)
-- "style": The documentary style/approach that fits best (e.g., "investigative journalism", "observational", "personal narrative", "educational", "cinematic")
-- "episodes": An array of episode objects, each with "title", "description", and "order"
-- "blueprintDocument": A detailed markdown document (1500-2500 words) that serves as the project blueprint, including:
-  * Executive Summary
-  * Project Overview and Goals
-  * Target Audience
-  * Visual Style and Tone
-  * Key Themes to Explore
-  * Production Approach
-  * Episode Breakdown with descriptions
-  * Editing Approach (detailed section covering):
-    - Pacing and rhythm guidelines
-    - Transition styles between scenes/segments
-    - Use of B-roll and cutaways
-    - Music and sound design direction
-    - Graphics and text overlay style
-    - Color grading/look recommendations
-    - Interview editing approach (jump cuts vs continuous, etc.)
-    - Narrative structure and story arc editing
-  * Potential Challenges and Considerations
-
-Example response format:
-{
-  "title": "Documentary Title",
-  "description": "What this documentary is about...",
-  "style": "investigative journalism",
-  "episodes": [
-    {"title": "Episode 1 Title", "description": "What this episode covers", "order": 1},
-    {"title": "Episode 2 Title", "description": "What this episode covers", "order": 2}
-  ],
-  "blueprintDocument": "# Project Blueprint\\n\\n## Executive Summary\\n..."
-}"""
+    system_prompt = BLUEPRINT_SYSTEM_PROMPT
 
     try:
         # Determine if it's a video or document
@@ -2076,7 +2814,7 @@ Example response format:
 
         if is_video:
             # For videos, use GCS URI for Gemini analysis
-            bucket = storage_client.bucket(STORAGE_BUCKET)
+            bucket = get_bucket(STORAGE_BUCKET)
             temp_blob = None
 
             if gcs_uri:
@@ -2106,19 +2844,13 @@ Return ONLY the JSON object as specified."""
 
             # Use multimodal model with video
             video_part = Part.from_uri(video_uri, mime_type=mime_type)
-            response = model.generate_content([system_prompt, video_part, prompt])
+            response = model_for(system_prompt).generate_content([video_part, prompt])
             result = response.text
 
             # Delete the temporary video file after analysis (only if we uploaded it)
+            # generate_content has returned, so Gemini is done reading it; no need to wait
             if temp_blob:
-                def cleanup_video():
-                    import time
-                    time.sleep(30)
-                    try:
-                        temp_blob.delete()
-                    except:
-                        pass
-                threading.Thread(target=cleanup_video, daemon=True).start()
+                delete_blobs_concurrently([temp_blob], wait=False)
 
         elif is_document:
             # For documents, analyze and generate a blueprint document
@@ -2137,7 +2869,7 @@ Based on the content, create:
 
 Return ONLY the JSON object as specified."""
 
-                response = model.generate_content([system_prompt, doc_part, prompt])
+                response = model_for(system_prompt).generate_content([doc_part, prompt])
                 result = response.text
             else:
                 # For text files, decode and send as text
@@ -2146,11 +2878,10 @@ Return ONLY the JSON object as specified."""
                 except:
                     text_content = file_content.decode('latin-1')
 
+                # The document goes in its own part, ahead of the instructions, like the PDF branch
+                doc_part = Part.from_text(f"DOCUMENT CONTENT:\n{text_content[:50000]}")
                 prompt = f"""Analyze this document and create a comprehensive documentary project blueprint.
 
-DOCUMENT CONTENT:
-{text_content[:50000]}
-
 Based on the content, create:
 1. A compelling project title
 2. A comprehensive description
@@ -2160,7 +2891,8 @@ Based on the content, create:
 
 Return ONLY the JSON object as specified."""
 
-                result = generate_ai_response(prompt, system_prompt)
+                response = model_for(system_prompt).generate_content([doc_part, prompt])
+                result = response.text
         else:
             return jsonify({"error": f"Unsupported file type: {ext}"}), 400
 
@@ -2171,47 +2903,14 @@ Return ONLY the JSON object as specified."""
             cleaned = '\n'.join(lines[1:-1] if lines[-1].startswith('```') else lines[1:])
 
         # Clean control characters that break JSON parsing
-        import re
-        # Remove all ASCII control characters except newline, tab, carriage return
-        cleaned = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', cleaned)
-        # Also remove extended control characters (0x80-0x9f)
-        cleaned = re.sub(r'[\x80-\x9f]', '', cleaned)
-
-        # Fix unescaped newlines inside JSON string values
-        # This is a common issue when AI generates long text content
-        def fix_json_strings(json_str):
-            """Fix newlines inside JSON string values by properly escaping them."""
-            result = []
-            in_string = False
-            escape_next = False
-
-            for char in json_str:
-                if escape_next:
-                    result.append(char)
-                    escape_next = False
-                elif char == '\\':
-                    result.append(char)
-                    escape_next = True
-                elif char == '"':
-                    result.append(char)
-                    in_string = not in_string
-                elif char == '\n' and in_string:
-                    # Newline inside string - escape it
-                    result.append('\\n')
-                elif char == '\r' and in_string:
-                    # Carriage return inside string - escape it
-                    result.append('\\r')
-                elif char == '\t' and in_string:
-                    # Tab inside string - escape it
-                    result.append('\\t')
-                else:
-                    result.append(char)
-
-            return ''.join(result)
-
-        cleaned = fix_json_strings(cleaned)
-
-        blueprint = json.loads(cleaned)
+        cleaned = JSON_CONTROL_CHARS_RE.sub('', cleaned)
+
+        # Fix unescaped newlines inside JSON string values, a common issue when AI
+        # generates long text content; well-formed output skips the repair pass
+        try:
+            blueprint = orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
+            blueprint = orjson.loads(fix_json_strings(cleaned))
 
         # Save the blueprint document to GCS
         blueprint_doc_content = blueprint.get('blueprintDocument', '')
@@ -2230,96 +2929,17 @@ Return ONLY the JSON object as specified."""
             for ep in blueprint.get('episodes', []):
                 blueprint_doc_content += f"\n### Episode {ep.get('order', '')}: {ep.get('title', '')}\n{ep.get('description', '')}\n"
 
-        # Convert markdown to PDF
-        import markdown
-
-        # Convert markdown to HTML
-        html_content = markdown.markdown(blueprint_doc_content, extensions=['tables', 'fenced_code'])
-
-        # Create styled HTML document
-        styled_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{
-            font-family: 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 40px;
-            color: #333;
-        }}
-        h1 {{
-            color: #1a1a1a;
-            border-bottom: 2px solid #2563eb;
-            padding-bottom: 10px;
-            margin-top: 0;
-        }}
-        h2 {{
-            color: #2563eb;
-            margin-top: 30px;
-            border-bottom: 1px solid #e5e7eb;
-            padding-bottom: 8px;
-        }}
-        h3 {{
-            color: #4b5563;
-            margin-top: 20px;
-        }}
-        p {{
-            margin-bottom: 12px;
-        }}
-        ul, ol {{
-            margin-bottom: 16px;
-            padding-left: 24px;
-        }}
-        li {{
-            margin-bottom: 6px;
-        }}
-        strong {{
-            color: #1a1a1a;
-        }}
-        .header {{
-            text-align: center;
-            margin-bottom: 40px;
-            padding-bottom: 20px;
-            border-bottom: 3px solid #2563eb;
-        }}
-        .header h1 {{
-            border: none;
-            margin-bottom: 10px;
-        }}
-        .header p {{
-            color: #6b7280;
-            font-style: italic;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>{blueprint.get('title', 'Documentary Blueprint')}</h1>
-        <p>Project Blueprint Document</p>
-    </div>
-    {html_content}
-</body>
-</html>"""
-
-        # Convert HTML to PDF using WeasyPrint
-        pdf_content = HTML(string=styled_html).write_pdf()
-
-        # Save PDF to GCS
-        bucket = storage_client.bucket(STORAGE_BUCKET)
-        doc_hash = hashlib.md5(blueprint_doc_content.encode()).hexdigest()
+        # Render and upload the PDF in the background; the name is content-hashed so it is known now
+        doc_hash = hashlib.blake2b(blueprint_doc_content.encode(), digest_size=16).hexdigest()
         doc_blob_name = f"blueprints/{doc_hash}_blueprint.pdf"
-        doc_blob = bucket.blob(doc_blob_name)
-        doc_blob.upload_from_string(pdf_content, content_type='application/pdf')
+        IO_EXECUTOR.submit(store_blueprint_pdf, doc_blob_name, blueprint.get('title', 'Documentary Blueprint'), blueprint_doc_content)
 
         # Create blueprint file info for the document
         blueprint["blueprintFile"] = {
             "path": doc_blob_name,
             "filename": f"{blueprint.get('title', 'Blueprint')[:50]}_blueprint.pdf",
             "mimeType": "application/pdf",
-            "size": len(pdf_content),
+            "status": "pending",
             "type": "document",
             "sourceFile": source_filename if is_video else None
         }
@@ -2335,24 +2955,37 @@ Return ONLY the JSON object as specified."""
 
 # ============== Document Serving Routes ==============
 
+def document_response(blob_path, disposition):
+    """Serve a GCS document with its ETag, answering 304 without downloading when the client's copy matches."""
+    blob = get_bucket(STORAGE_BUCKET).get_blob(blob_path)
+    if blob is None:
+        return jsonify({"error": "Document not found"}), 404
+
+    if request.if_none_match.contains(blob.etag):
+        response = Response(status=304)
+    elif request.method == 'HEAD':
+        # Existence checks (e.g. polling for a pending blueprint PDF) don't need the bytes
+        response = Response(mimetype=blob.content_type or 'application/octet-stream')
+        response.content_length = blob.size
+    else:
+        response = Response(
+            blob.download_as_bytes(),
+            mimetype=blob.content_type or 'application/octet-stream',
+            headers={'Content-Disposition': f'{disposition}; filename="{blob_path.split("/")[-1]}"'}
+        )
+    if blob_path.startswith(IMMUTABLE_DOCUMENT_PREFIXES):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(blob.etag)
+    return response
+
+
 @app.route("/api/document/<path:blob_path>")
 def get_document(blob_path):
     """Serve a document from GCS (inline viewing)."""
     try:
-        bucket = storage_client.bucket(STORAGE_BUCKET)
-        blob = bucket.blob(blob_path)
-
-        if not blob.exists():
-            return jsonify({"error": "Document not found"}), 404
-
-        content = blob.download_as_bytes()
-        content_type = blob.content_type or 'application/octet-stream'
-
-        return Response(
-            content,
-            mimetype=content_type,
-            headers={'Content-Disposition': f'inline; filename="{blob_path.split("/")[-1]}"'}
-        )
+        return document_response(blob_path, 'inline')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2361,21 +2994,7 @@ def get_document(blob_path):
 def download_document(blob_path):
     """Download a document from GCS (attachment)."""
     try:
-        bucket = storage_client.bucket(STORAGE_BUCKET)
-        blob = bucket.blob(blob_path)
-
-        if not blob.exists():
-            return jsonify({"error": "Document not found"}), 404
-
-        content = blob.download_as_bytes()
-        content_type = blob.content_type or 'application/octet-stream'
-        filename = blob_path.split("/")[-1]
-
-        return Response(
-            content,
-            mimetype=content_type,
-            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
-        )
+        return document_response(blob_path, 'attachment')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2384,7 +3003,7 @@ def download_document(blob_path):
 def get_source_documents(project_id):
     """Get all source documents for a project."""
     try:
-        docs_ref = db.collection(COLLECTIONS['assets']).where(
+        docs_ref = COLLECTION_REFS['assets'].where(
             'projectId', '==', project_id
         ).where(
             'isSourceDocument', '==', True
@@ -2405,17 +3024,20 @@ def get_source_documents(project_id):
 def init_sample_data():
     """Initialize sample data for testing."""
     # Check if project already exists
-    existing = list(db.collection(COLLECTIONS['projects']).limit(1).stream())
+    existing = list(COLLECTION_REFS['projects'].select([]).limit(1).stream())
     if existing:
         return jsonify({"message": "Data already exists", "projectId": existing[0].id})
 
+    # Queue every sample document on one batch so they commit in a single round trip
+    batch = db.batch()
+
     # Create sample project
     project_data = {
         'title': 'Apollo 11: Journey to the Moon',
         'description': 'A comprehensive documentary series exploring the historic first moon landing',
         'status': 'In Production'
     }
-    project = create_doc('projects', project_data)
+    project = create_doc('projects', project_data, batch=batch)
     project_id = project['id']
 
     # Create sample episodes
@@ -2426,7 +3048,7 @@ def init_sample_data():
         {'projectId': project_id, 'title': 'Episode 4: One Small Step', 'description': 'The lunar landing and moonwalk', 'status': 'Planning', 'duration': '45 min'}
     ]
     for ep in episodes:
-        create_doc('episodes', ep)
+        create_doc('episodes', ep, batch=batch)
 
     # Create sample research
     research_items = [
@@ -2434,7 +3056,7 @@ def init_sample_data():
         {'projectId': project_id, 'title': 'Cold War Context Research', 'content': 'Key sources: "The Right Stuff" by Tom Wolfe, Smithsonian Air & Space Museum archives, Kennedy Space Center historical records.', 'category': 'Background'}
     ]
     for r in research_items:
-        create_doc('research', r)
+        create_doc('research', r, batch=batch)
 
     # Create sample interviews
     interviews = [
@@ -2442,7 +3064,7 @@ def init_sample_data():
         {'projectId': project_id, 'subject': 'Gene Kranz', 'role': 'Flight Director', 'status': 'Requested', 'questions': 'Describe mission control during landing.\nWhat was the most critical moment?\nHow did the team prepare?', 'notes': 'Contact through NASA public affairs'}
     ]
     for i in interviews:
-        create_doc('interviews', i)
+        create_doc('interviews', i, batch=batch)
 
     # Create sample shots
     shots = [
@@ -2450,7 +3072,7 @@ def init_sample_data():
         {'projectId': project_id, 'description': 'Saturn V rocket at Space Center Houston', 'location': 'Houston, TX', 'equipment': 'Gimbal, 4K camera', 'status': 'Pending'}
     ]
     for s in shots:
-        create_doc('shots', s)
+        create_doc('shots', s, batch=batch)
 
     # Create sample assets
     assets = [
@@ -2459,7 +3081,7 @@ def init_sample_data():
         {'projectId': project_id, 'title': 'Lunar Surface Photos', 'type': 'Image', 'source': 'NASA/Hasselblad', 'status': 'Acquired', 'notes': 'High-res scans of original photos'}
     ]
     for a in assets:
-        create_doc('assets', a)
+        create_doc('assets', a, batch=batch)
 
     # Create sample script
     script = {
@@ -2480,11 +3102,13 @@ ACT 3: APOLLO 11 CREW
 - Training montage
 - Mission objectives'''
     }
-    create_doc('scripts', script)
+    create_doc('scripts', script, batch=batch)
+
+    batch.commit()
 
     return jsonify({"message": "Sample data created", "projectId": project_id})
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port, debug=os.environ.get("FLASK_DEBUG") == "1")
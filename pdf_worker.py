@@ -0,0 +1,55 @@
+"""
+Out-of-process HTML to PDF rendering for the Documentary Production App.
+
+WeasyPrint rendering is pure CPU work that would otherwise stall every other
+request sharing a gevent worker. This module deliberately imports nothing from
+app.py so spawned pool processes start quickly and hold no Firestore/GCS clients.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Each render can take 50-200MB, so keep the pool small
+PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", "2"))
+
+
+def new_pdf_pool():
+    """Start an empty render pool; processes are spawned on first submit."""
+    # spawn rather than fork: children must not inherit the worker's gevent hub or gRPC channels
+    return ProcessPoolExecutor(
+        max_workers=PDF_RENDER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+# A pool whose child dies (e.g. OOM-killed) is broken for good, so it gets replaced
+# rather than reused; always read it as pdf_worker.PDF_POOL, never import the name
+PDF_POOL = new_pdf_pool()
+PDF_POOL_LOCK = threading.Lock()
+
+
+def replace_pdf_pool(broken_pool):
+    """Swap a fresh pool in for broken_pool, unless another caller already has, and return the current pool."""
+    global PDF_POOL
+    with PDF_POOL_LOCK:
+        if PDF_POOL is broken_pool:
+            PDF_POOL = new_pdf_pool()
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+        return PDF_POOL
+
+
+# Parsed stylesheets keyed by CSS text, so each pool process only parses a given sheet once
+STYLESHEETS = {}
+
+
+def render_pdf(html_content, base_url=None, css=None):
+    """Render an HTML string to PDF bytes, applying css as a cached stylesheet if given."""
+    from weasyprint import CSS, HTML
+    stylesheets = None
+    if css:
+        stylesheet = STYLESHEETS.get(css)
+        if stylesheet is None:
+            stylesheet = STYLESHEETS[css] = CSS(string=css)
+        stylesheets = [stylesheet]
+    return HTML(string=html_content, base_url=base_url).write_pdf(stylesheets=stylesheets)
@@ -0,0 +1,247 @@
+"""Unit tests for app.py's pure helper functions (no GCP access needed).
+
+Run with: python -m pytest test_helpers.py  (or python test_helpers.py)
+"""
+import json
+import os
+import unittest
+from unittest import mock
+
+import google.auth
+from google.auth.credentials import AnonymousCredentials
+
+os.environ.setdefault("GCP_PROJECT_ID", "test-project")
+
+# app.py builds its Firestore and Storage clients at import; anonymous credentials keep that offline
+with mock.patch.object(google.auth, "default", return_value=(AnonymousCredentials(), "test-project")):
+    import app
+
+
+class FixJsonStringsTest(unittest.TestCase):
+    """fix_json_strings escapes raw whitespace inside string values only."""
+
+    def test_escapes_raw_newlines_tabs_and_returns_in_strings(self):
+        raw = '{"description": "line one\nline two\r\n\tindented"}'
+        fixed = app.fix_json_strings(raw)
+        self.assertEqual(json.loads(fixed)["description"], "line one\nline two\r\n\tindented")
+
+    def test_leaves_whitespace_between_tokens_alone(self):
+        raw = '{\n\t"title": "A",\n\t"episodes": [1, 2]\n}'
+        self.assertEqual(app.fix_json_strings(raw), raw)
+
+    def test_keeps_existing_escapes(self):
+        raw = '{"a": "already\\nescaped \\"quoted\\" \\\\ slash"}'
+        self.assertEqual(app.fix_json_strings(raw), raw)
+
+    def test_escaped_quote_does_not_end_the_string(self):
+        raw = '{"a": "say \\"hi\\"\nthen leave", "b": "x\ty"}'
+        parsed = json.loads(app.fix_json_strings(raw))
+        self.assertEqual(parsed["a"], 'say "hi"\nthen leave')
+        self.assertEqual(parsed["b"], "x\ty")
+
+    def test_multiple_strings_and_unicode(self):
+        raw = '{"title": "Café\nNoir", "episodes": [{"title": "Ep\n1"}, {"title": "Ep 2"}]}'
+        parsed = json.loads(app.fix_json_strings(raw))
+        self.assertEqual(parsed["title"], "Café\nNoir")
+        self.assertEqual([ep["title"] for ep in parsed["episodes"]], ["Ep\n1", "Ep 2"])
+
+    def test_valid_json_is_unchanged(self):
+        raw = json.dumps({"title": "Plain", "items": ["a", "b"], "n": 3})
+        self.assertEqual(app.fix_json_strings(raw), raw)
+
+
+class ParseByteRangeTest(unittest.TestCase):
+    """parse_byte_range resolves single Range headers for get_asset_file."""
+
+    def test_no_header_is_whole_file(self):
+        self.assertEqual(app.parse_byte_range(None, 100), (0, 99, False))
+        self.assertEqual(app.parse_byte_range("", 100), (0, 99, False))
+
+    def test_closed_range(self):
+        self.assertEqual(app.parse_byte_range("bytes=10-19", 100), (10, 19, True))
+
+    def test_open_ended_range(self):
+        self.assertEqual(app.parse_byte_range("bytes=90-", 100), (90, 99, True))
+
+    def test_end_past_file_is_clamped(self):
+        self.assertEqual(app.parse_byte_range("bytes=50-500", 100), (50, 99, True))
+
+    def test_suffix_range(self):
+        self.assertEqual(app.parse_byte_range("bytes=-10", 100), (90, 99, True))
+
+    def test_suffix_longer_than_file_is_whole_file(self):
+        self.assertEqual(app.parse_byte_range("bytes=-500", 100), (0, 99, True))
+
+    def test_start_past_end_of_file_is_unsatisfiable(self):
+        self.assertIsNone(app.parse_byte_range("bytes=100-", 100))
+        self.assertIsNone(app.parse_byte_range("bytes=150-200", 100))
+
+    def test_zero_length_suffix_is_unsatisfiable(self):
+        self.assertIsNone(app.parse_byte_range("bytes=-0", 100))
+
+    def test_any_range_on_empty_file_is_unsatisfiable(self):
+        self.assertIsNone(app.parse_byte_range("bytes=0-", 0))
+
+    def test_unsupported_forms_fall_back_to_whole_file(self):
+        for header in ("bytes=0-1,5-6", "bytes=-", "items=0-5", "bytes=a-b"):
+            self.assertEqual(app.parse_byte_range(header, 100), (0, 99, False), header)
+
+
+class FitResearchContextTest(unittest.TestCase):
+    """fit_research_context trims to budget without depending on the query."""
+
+    @staticmethod
+    def docs(*lengths):
+        return [{"source": f"doc{i}", "content": "x" * n} for i, n in enumerate(lengths)]
+
+    def test_within_budget_is_unchanged(self):
+        docs = self.docs(10, 20)
+        self.assertEqual(app.fit_research_context(docs, budget=100), docs)
+
+    def test_shorter_documents_are_kept_whole_first(self):
+        fitted = app.fit_research_context(self.docs(50, 10, 30), budget=60)
+        self.assertEqual([doc["source"] for doc in fitted], ["doc0", "doc1", "doc2"])
+        self.assertEqual(fitted[1]["content"], "x" * 10)
+        self.assertEqual(fitted[2]["content"], "x" * 30)
+        self.assertTrue(fitted[0]["content"].startswith("x" * 20 + "\n[Truncated"))
+
+    def test_documents_past_the_budget_are_omitted(self):
+        fitted = app.fit_research_context(self.docs(40, 40, 40), budget=40)
+        self.assertEqual(fitted[0]["content"], "x" * 40)
+        self.assertTrue(fitted[1]["content"].startswith("[Omitted"))
+        self.assertTrue(fitted[2]["content"].startswith("[Omitted"))
+
+    def test_output_is_deterministic_for_the_same_documents(self):
+        docs = self.docs(30, 25, 30, 5)
+        self.assertEqual(app.fit_research_context(docs, budget=50), app.fit_research_context(docs, budget=50))
+
+
+class FakeBlob:
+    """Records what each compose call was given."""
+
+    def __init__(self, name):
+        self.name = name
+        self.content_type = None
+        self.composed_from = None
+
+    def compose(self, sources):
+        self.composed_from = [source.name for source in sources]
+
+    def reload(self):
+        pass
+
+
+class FakeBucket:
+    def __init__(self):
+        self.blobs = {}
+
+    def blob(self, name):
+        return self.blobs.setdefault(name, FakeBlob(name))
+
+    def expand(self, name):
+        """Source names reached by following intermediate compose objects, in order."""
+        blob = self.blobs.get(name)
+        if blob is None or blob.composed_from is None:
+            return [name]
+        return [leaf for part in blob.composed_from for leaf in self.expand(part)]
+
+
+class ComposeBlobsTest(unittest.TestCase):
+    """compose_blobs stages more than GCS_COMPOSE_LIMIT sources through intermediates."""
+
+    def compose(self, count):
+        bucket = FakeBucket()
+        sources = [bucket.blob(f"chunks/{i:05d}") for i in range(count)]
+        with mock.patch.object(app, "delete_blobs_concurrently") as delete:
+            final = app.compose_blobs(bucket, sources, "final.bin", "video/mp4", "scratch/")
+        return bucket, final, delete
+
+    def test_up_to_the_limit_composes_directly(self):
+        bucket, final, delete = self.compose(app.GCS_COMPOSE_LIMIT)
+        self.assertEqual(final.composed_from, [f"chunks/{i:05d}" for i in range(app.GCS_COMPOSE_LIMIT)])
+        self.assertEqual(final.content_type, "video/mp4")
+        delete.assert_not_called()
+
+    def test_one_past_the_limit_uses_one_stage(self):
+        bucket, final, delete = self.compose(app.GCS_COMPOSE_LIMIT + 1)
+        self.assertEqual(final.composed_from, ["scratch/level0_0000", "scratch/level0_0001"])
+        self.assertEqual(bucket.expand("final.bin"), [f"chunks/{i:05d}" for i in range(app.GCS_COMPOSE_LIMIT + 1)])
+        self.assertEqual([blob.name for blob in delete.call_args[0][0]], final.composed_from)
+
+    def test_many_sources_use_several_stages_in_order(self):
+        count = app.GCS_COMPOSE_LIMIT ** 2 + 5
+        bucket, final, delete = self.compose(count)
+        for blob in bucket.blobs.values():
+            if blob.composed_from is not None:
+                self.assertLessEqual(len(blob.composed_from), app.GCS_COMPOSE_LIMIT)
+        self.assertTrue(all(name.startswith("scratch/level1_") for name in final.composed_from))
+        self.assertEqual(bucket.expand("final.bin"), [f"chunks/{i:05d}" for i in range(count)])
+        deleted = [blob.name for blob in delete.call_args[0][0]]
+        self.assertNotIn("final.bin", deleted)
+        self.assertTrue(all(name.startswith("scratch/") for name in deleted))
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data=None):
+        self.id = doc_id
+        self.exists = data is not None
+        self.data = data
+
+    def to_dict(self):
+        return dict(self.data)
+
+
+class GetDocsPageTest(unittest.TestCase):
+    """get_docs_page pages by updatedAt with a document-ID cursor."""
+
+    def setUp(self):
+        self.collection = mock.MagicMock()
+        self.query = mock.MagicMock()
+        self.collection.where.return_value = self.query
+        self.collection.order_by.return_value = self.query
+        for method in ("where", "order_by", "select", "start_after", "limit"):
+            getattr(self.query, method).return_value = self.query
+        patcher = mock.patch.dict(app.COLLECTION_REFS, {"episodes": self.collection})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream(self, *ids):
+        self.query.stream.return_value = [FakeSnapshot(doc_id, {"title": doc_id}) for doc_id in ids]
+
+    def test_full_page_returns_last_id_as_cursor(self):
+        self.stream("a", "b")
+        items, cursor = app.get_docs_page("episodes", "p1", limit=2)
+        self.assertEqual([item["id"] for item in items], ["a", "b"])
+        self.assertEqual(cursor, "b")
+        self.collection.where.assert_called_once_with("projectId", "==", "p1")
+        self.query.order_by.assert_called_once_with("updatedAt")
+        self.query.limit.assert_called_once_with(2)
+
+    def test_short_page_is_the_last(self):
+        self.stream("a")
+        _, cursor = app.get_docs_page("episodes", "p1", limit=2)
+        self.assertIsNone(cursor)
+
+    def test_cursor_starts_after_that_document(self):
+        cursor_snapshot = FakeSnapshot("b", {"updatedAt": "2026-01-01T00:00:00"})
+        self.collection.document.return_value.get.return_value = cursor_snapshot
+        self.stream("c")
+        items, _ = app.get_docs_page("episodes", "p1", limit=2, after="b")
+        self.collection.document.assert_called_once_with("b")
+        self.query.start_after.assert_called_once_with(cursor_snapshot)
+        self.assertEqual([item["id"] for item in items], ["c"])
+
+    def test_missing_cursor_document_is_rejected(self):
+        self.collection.document.return_value.get.return_value = FakeSnapshot("gone")
+        with self.assertRaises(ValueError):
+            app.get_docs_page("episodes", "p1", limit=2, after="gone")
+        self.query.stream.assert_not_called()
+
+    def test_fields_are_projected(self):
+        self.stream()
+        app.get_docs_page("episodes", limit=5, fields=["title"])
+        self.query.select.assert_called_once_with(["title"])
+
+
+if __name__ == "__main__":
+    unittest.main()